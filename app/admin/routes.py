@@ -2,6 +2,7 @@
 Admin panel web routes using Jinja2 templates.
 Simple web UI for managing tenants and documents.
 """
+import asyncio
 from fastapi import APIRouter, Request, Form, HTTPException, Depends, UploadFile, File
 from fastapi.responses import HTMLResponse, RedirectResponse
 from fastapi.templating import Jinja2Templates
@@ -18,6 +19,7 @@ from app.core.security import generate_api_key
 from app.services.document_processor import get_document_processor
 from app.services.vector_store import get_vector_store
 from app.services.rag_service import get_rag_service
+from app.services.lookup_cache import get_lookup_cache, SCOPE_AUTH, SCOPE_ASSISTANTS
 import json as json_module
 
 settings = get_settings()
@@ -272,6 +274,7 @@ async def toggle_tenant(
         tenant.updated_at = datetime.utcnow()
         db.add(tenant)
         await db.commit()
+        await get_lookup_cache().publish_invalidation(tenant_id, SCOPE_AUTH)
 
     return RedirectResponse(url=f"/admin/tenants/{tenant_id}", status_code=303)
 
@@ -380,9 +383,9 @@ async def upload_document_web(
     await db.commit()
 
     try:
-        content = await file.read()
-        chunks = processor.process_file(
-            content=content,
+        chunks = await asyncio.to_thread(
+            processor.process_file,
+            content=file.file,
             filename=file.filename,
             document_id=document_id,
             metadata={"title": title, "document_type": document_type},
@@ -534,6 +537,7 @@ async def create_assistant_web(
     )
     db.add(assistant)
     await db.commit()
+    await get_lookup_cache().publish_invalidation(tenant_id, SCOPE_ASSISTANTS)
 
     return RedirectResponse(url=f"/admin/tenants/{tenant_id}/assistants/{assistant.id}", status_code=303)
 
@@ -627,6 +631,7 @@ async def update_assistant_web(
     assistant.updated_at = datetime.utcnow()
     db.add(assistant)
     await db.commit()
+    await get_lookup_cache().publish_invalidation(assistant.tenant_id, SCOPE_ASSISTANTS)
 
     return RedirectResponse(url=f"/admin/tenants/{tenant_id}/assistants/{assistant_id}", status_code=303)
 
@@ -650,6 +655,7 @@ async def toggle_assistant(
         assistant.updated_at = datetime.utcnow()
         db.add(assistant)
         await db.commit()
+        await get_lookup_cache().publish_invalidation(assistant.tenant_id, SCOPE_ASSISTANTS)
 
     return RedirectResponse(url=f"/admin/tenants/{tenant_id}/assistants/{assistant_id}", status_code=303)
 
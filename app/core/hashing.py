@@ -0,0 +1,28 @@
+"""
+Fast content hashing for cache keys.
+Not for security: uses BLAKE3 when installed, SHA-256 otherwise.
+"""
+import hashlib
+
+try:
+    from blake3 import blake3
+except ImportError:
+    blake3 = None
+
+
+def hash_content(data: bytes) -> str:
+    """
+    Hash content into a 32-char hex digest.
+
+    Uses BLAKE3 when installed (much faster than SHA-256); digests are only
+    used as cache keys, so there's no security requirement.
+
+    Args:
+        data: The bytes to hash
+
+    Returns:
+        32 hex characters (128 bits)
+    """
+    if blake3 is not None:
+        return blake3(data).hexdigest(length=16)
+    return hashlib.sha256(data).hexdigest()[:32]
@@ -0,0 +1,44 @@
+"""
+Shared HTTP client for the OpenAI and Anthropic SDKs.
+One connection pool (with HTTP/2 when available) for all outbound API calls.
+"""
+import httpx
+
+from app.config import get_settings
+
+settings = get_settings()
+
+try:
+    import h2  # noqa: F401  (required by httpx for HTTP/2)
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# Shared client singleton
+_http_client: httpx.AsyncClient | None = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Get the shared HTTP client instance."""
+    global _http_client
+    if _http_client is None:
+        _http_client = httpx.AsyncClient(
+            http2=HTTP2_AVAILABLE,
+            limits=httpx.Limits(
+                max_connections=settings.http_max_connections,
+                max_keepalive_connections=settings.http_max_keepalive_connections,
+            ),
+            timeout=httpx.Timeout(
+                settings.http_timeout_seconds,
+                connect=settings.http_connect_timeout_seconds,
+            ),
+        )
+    return _http_client
+
+
+async def close_http_client():
+    """Close the shared HTTP client."""
+    global _http_client
+    if _http_client:
+        await _http_client.aclose()
+        _http_client = None
@@ -0,0 +1,60 @@
+"""
+Fast JSON encoding/decoding helpers.
+Uses orjson when available and falls back to the standard library.
+"""
+import json as _stdlib_json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# orjson.JSONDecodeError subclasses this, so callers can catch either
+JSONDecodeError = _stdlib_json.JSONDecodeError
+
+
+def _stdlib_dumps(obj: Any, sort_keys: bool, indent: bool) -> bytes:
+    """Encode with the standard library using orjson-like output."""
+    return _stdlib_json.dumps(
+        obj,
+        ensure_ascii=False,
+        sort_keys=sort_keys,
+        indent=2 if indent else None,
+        separators=None if indent else (",", ":"),
+        default=str,
+    ).encode("utf-8")
+
+
+def dumps(obj: Any, *, sort_keys: bool = False, indent: bool = False) -> bytes:
+    """
+    Serialize an object to UTF-8 JSON bytes.
+
+    Args:
+        obj: The object to serialize
+        sort_keys: Sort object keys (for stable hashing)
+        indent: Pretty-print with a 2-space indent
+
+    Returns:
+        Compact (or indented) JSON as bytes
+    """
+    if orjson is None:
+        return _stdlib_dumps(obj, sort_keys, indent)
+
+    option = orjson.OPT_NON_STR_KEYS
+    if sort_keys:
+        option |= orjson.OPT_SORT_KEYS
+    if indent:
+        option |= orjson.OPT_INDENT_2
+    try:
+        return orjson.dumps(obj, option=option)
+    except orjson.JSONEncodeError:
+        # e.g. integers larger than 64 bits, which orjson rejects
+        return _stdlib_dumps(obj, sort_keys, indent)
+
+
+def loads(data: str | bytes) -> Any:
+    """Deserialize JSON from str or bytes."""
+    if orjson is None:
+        return _stdlib_json.loads(data)
+    return orjson.loads(data)
@@ -0,0 +1,61 @@
+"""
+int8 quantization for embedding vectors.
+Cached vectors are stored as a float32 scale followed by one signed byte per
+dimension, about 4x smaller than float32 with negligible effect on similarity.
+"""
+import struct
+from typing import List, Sequence
+
+import numpy as np
+
+_SCALE = struct.Struct("<f")
+
+
+def quantize_int8(vector: Sequence[float]) -> bytes:
+    """
+    Quantize a vector to int8 with a per-vector scale.
+
+    Args:
+        vector: The embedding vector
+
+    Returns:
+        4-byte little-endian float32 scale followed by the int8 values
+    """
+    values = np.asarray(vector, dtype=np.float32)
+    max_abs = float(np.abs(values).max()) if values.size else 0.0
+    scale = max_abs / 127 if max_abs else 1.0
+    quantized = np.clip(np.rint(values / scale), -127, 127).astype(np.int8)
+    return _SCALE.pack(scale) + quantized.tobytes()
+
+
+def quantize_int8_rows(matrix: np.ndarray) -> np.ndarray:
+    """
+    Quantize each row of a matrix to int8 levels without keeping the scales.
+
+    Every row points in the same direction as before, so cosine similarity
+    is unchanged apart from rounding.
+
+    Args:
+        matrix: (N, D) array of embedding vectors
+
+    Returns:
+        (N, D) int8 array with values in [-127, 127]
+    """
+    max_abs = np.abs(matrix).max(axis=1, keepdims=True)
+    scales = np.where(max_abs > 0, max_abs / 127, 1.0)
+    return np.clip(np.rint(matrix / scales), -127, 127).astype(np.int8)
+
+
+def dequantize_int8(data: bytes) -> List[float]:
+    """
+    Restore a vector produced by quantize_int8.
+
+    Args:
+        data: Scale followed by int8 values
+
+    Returns:
+        The approximate embedding vector
+    """
+    (scale,) = _SCALE.unpack_from(data)
+    values = np.frombuffer(data, dtype=np.int8, offset=_SCALE.size)
+    return (values.astype(np.float32) * scale).tolist()
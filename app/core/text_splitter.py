@@ -0,0 +1,97 @@
+"""
+Single-pass text splitter for document chunking.
+Replaces LangChain's RecursiveCharacterTextSplitter on the ingestion path.
+"""
+from typing import List, Sequence
+
+
+DEFAULT_SEPARATORS = ("\n\n", "\n", ". ", " ")
+
+# Characters an overlapping chunk may start after, so it begins on a word
+_WORD_BOUNDARIES = (" ", "\n")
+
+
+class TextSplitter:
+    """
+    Splits text into chunks of at most chunk_size characters.
+
+    Walks the text once with a sliding window. Each chunk ends at the last
+    occurrence of the highest-priority separator inside the window (falling
+    back to a hard cut), and the next chunk starts up to chunk_overlap
+    characters (and at most half a chunk) before that point, aligned to a
+    word boundary. All searches
+    use str.rfind/str.find, so no intermediate splits are built.
+    """
+
+    def __init__(
+        self,
+        chunk_size: int = 1000,
+        chunk_overlap: int = 200,
+        separators: Sequence[str] = DEFAULT_SEPARATORS,
+    ):
+        if chunk_overlap >= chunk_size:
+            raise ValueError("chunk_overlap must be smaller than chunk_size")
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.separators = tuple(sep for sep in separators if sep)
+
+    def _find_end(self, text: str, start: int, limit: int, min_end: int) -> int:
+        """
+        Find where the chunk starting at start should end.
+
+        The end is at most limit and past min_end (the end of the previous
+        chunk), so every chunk adds text beyond the overlap.
+        """
+        for separator in self.separators:
+            position = text.rfind(separator, start, limit)
+            # Keep the separator with the chunk it ends
+            end = min(position + len(separator), limit)
+            if position > start and end > min_end:
+                return end
+        return limit
+
+    def _find_next_start(self, text: str, start: int, end: int) -> int:
+        """Find where the chunk after [start, end) begins, including overlap."""
+        # Overlap at most half of a chunk, so a chunk cut short by a
+        # paragraph break isn't mostly repeated in the next one
+        next_start = max(end - self.chunk_overlap, start + (end - start + 1) // 2)
+        if next_start >= end:
+            return end
+        positions = [
+            position
+            for position in (text.find(b, next_start - 1, end) for b in _WORD_BOUNDARIES)
+            if position != -1
+        ]
+        if positions:
+            return max(min(positions) + 1, next_start)
+        return next_start
+
+    def split_text(self, text: str) -> List[str]:
+        """
+        Split text into chunks.
+
+        Args:
+            text: The text to split
+
+        Returns:
+            List of non-empty, whitespace-stripped chunks
+        """
+        chunks = []
+        start = end = 0
+        length = len(text)
+
+        while start < length:
+            limit = min(start + self.chunk_size, length)
+            if limit < length:
+                end = self._find_end(text, start, limit, min_end=end)
+            else:
+                end = limit
+
+            chunk = text[start:end].strip()
+            if chunk:
+                chunks.append(chunk)
+            if end >= length:
+                break
+            start = self._find_next_start(text, start, end)
+
+        return chunks
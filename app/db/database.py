@@ -1,6 +1,7 @@
 from sqlmodel import SQLModel, create_engine, Session
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
 from app.config import get_settings
 
 settings = get_settings()
@@ -11,10 +12,24 @@ async_database_url = settings.database_url.replace(
 )
 
 # Async engine for the application
+# Every endpoint checks out a connection through get_db, so the pool is sized
+# explicitly instead of relying on the 5 + 10 QueuePool default.
 async_engine = create_async_engine(
     async_database_url,
     echo=False,
     future=True,
+    pool_size=settings.db_pool_size,
+    max_overflow=settings.db_max_overflow,
+    pool_timeout=settings.db_pool_timeout,
+    pool_recycle=settings.db_pool_recycle,
+    pool_pre_ping=True,
+)
+
+# Separate engine for health probes so they never wait on the request pool
+health_engine = create_async_engine(
+    async_database_url,
+    echo=False,
+    poolclass=NullPool,
 )
 
 # Async session factory
@@ -33,10 +48,18 @@ sync_engine = create_engine(
 )
 
 
+def _create_missing_indexes(conn):
+    """Create indexes added to tables that already exist (create_all skips them)."""
+    for table in SQLModel.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(conn, checkfirst=True)
+
+
 async def init_db():
-    """Initialize database tables."""
+    """Initialize database tables and indexes."""
     async with async_engine.begin() as conn:
         await conn.run_sync(SQLModel.metadata.create_all)
+        await conn.run_sync(_create_missing_indexes)
 
 
 async def get_session() -> AsyncSession:
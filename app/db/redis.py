@@ -10,10 +10,11 @@ _redis_client: redis.Redis | None = None
 async def init_redis() -> redis.Redis:
     """Initialize Redis connection."""
     global _redis_client
+    # Responses stay bytes: cached embeddings are binary, and JSON/msgpack
+    # payloads are decoded from bytes directly
     _redis_client = await redis.from_url(
         settings.redis_url,
-        encoding="utf-8",
-        decode_responses=True,
+        decode_responses=False,
     )
     return _redis_client
 
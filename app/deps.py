@@ -8,7 +8,8 @@ from datetime import datetime
 
 from app.db.database import get_session
 from app.models.tenant import Tenant, APIKey
-from app.core.security import extract_prefix, verify_api_key
+from app.core.security import extract_prefix, hash_api_key, verify_api_key
+from app.services.lookup_cache import get_lookup_cache
 from app.config import get_settings
 
 settings = get_settings()
@@ -28,7 +29,8 @@ async def get_current_tenant(
     Authenticate request and return the associated tenant.
 
     Extracts API key from header, validates it, and returns the tenant.
-    Updates last_used_at timestamp on the API key.
+    Successful lookups are cached briefly, so last_used_at is only updated
+    when the key is resolved from the database.
 
     Raises:
         HTTPException: If API key is invalid, expired, or tenant is inactive
@@ -42,6 +44,20 @@ async def get_current_tenant(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
+    # Serve recently authenticated keys without touching the database
+    lookup_cache = get_lookup_cache()
+    key_hash = hash_api_key(x_api_key)
+    cached = lookup_cache.get_tenant(key_hash)
+    if cached:
+        tenant, expires_at = cached
+        if expires_at and expires_at < datetime.utcnow():
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="API key has expired",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        return tenant
+
     # Look up API key by prefix
     stmt = (
         select(APIKey)
@@ -91,6 +107,7 @@ async def get_current_tenant(
     db.add(api_key)
     await db.commit()
 
+    lookup_cache.set_tenant(key_hash, tenant, api_key.expires_at)
     return tenant
 
 
@@ -1,10 +1,16 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from contextlib import asynccontextmanager
+import asyncio
 
 from app.config import get_settings
 from app.db.database import init_db
 from app.db.redis import init_redis, close_redis
+from app.core.http_client import close_http_client
+from app.services.embedding_service import get_embedding_service
+from app.services.lookup_cache import get_lookup_cache
+from app.services.rag_service import get_rag_service
 
 # Import routers
 from app.routers import health, admin, evaluate, documents
@@ -25,6 +31,23 @@ async def lifespan(app: FastAPI):
     print("✓ Database initialized")
     await init_redis()
     print("✓ Redis initialized")
+    invalidation_listener = asyncio.create_task(
+        get_lookup_cache().listen_for_invalidations()
+    )
+    print("✓ Lookup cache invalidation listener started")
+    # Build the RAG service (and its LLM/vector/cache clients) up front so
+    # the first request doesn't pay for it
+    try:
+        get_rag_service()
+        print("✓ RAG service initialized")
+    except Exception as e:
+        print(f"Warning: Could not initialize RAG service: {e}")
+    snapshot_task = None
+    if settings.embedding_cache_snapshot_path:
+        snapshot_task = asyncio.create_task(
+            get_embedding_service().snapshot_query_cache_loop()
+        )
+        print("✓ Query embedding snapshots enabled")
     print("=" * 50)
     print("Service ready!")
     print("Admin panel: http://localhost:8000/admin")
@@ -34,7 +57,15 @@ async def lifespan(app: FastAPI):
     yield
     # Shutdown
     print("Shutting down...")
+    invalidation_listener.cancel()
+    if snapshot_task is not None:
+        snapshot_task.cancel()
+        try:
+            await get_embedding_service().save_query_cache_snapshot()
+        except Exception as e:
+            print(f"Warning: Could not save query embedding snapshot: {e}")
     await close_redis()
+    await close_http_client()
     print("Connections closed")
 
 
@@ -62,6 +93,7 @@ Usa el header `X-API-Key` con tu API key de tenant para los endpoints de query y
 """,
     version="1.0.0",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 # CORS middleware
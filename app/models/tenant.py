@@ -1,4 +1,5 @@
 from sqlmodel import SQLModel, Field, Relationship
+from sqlalchemy import Index
 from datetime import datetime
 from uuid import UUID, uuid4
 from typing import Optional
@@ -183,3 +184,21 @@ class QueryLog(SQLModel, table=True):
     # Relationships
     tenant: Tenant = Relationship(back_populates="query_logs")
     assistant: Optional["Assistant"] = Relationship()
+
+
+# Composite indexes matching the /logs list and detail queries
+Index("ix_query_logs_tenant_created", QueryLog.tenant_id, QueryLog.created_at.desc())
+Index(
+    "ix_query_logs_tenant_status_created",
+    QueryLog.tenant_id,
+    QueryLog.status,
+    QueryLog.created_at.desc(),
+)
+Index(
+    "ix_query_logs_tenant_assistant_created",
+    QueryLog.tenant_id,
+    QueryLog.assistant_id,
+    QueryLog.created_at.desc(),
+    postgresql_where=QueryLog.assistant_id.isnot(None),
+)
+Index("ix_query_logs_tenant_query_id", QueryLog.tenant_id, QueryLog.query_id)
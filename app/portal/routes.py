@@ -2,6 +2,7 @@
 Tenant portal web routes.
 Allows tenants to login and manage their own data (assistants, documents, API keys, logs).
 """
+import asyncio
 from fastapi import APIRouter, Request, Form, HTTPException, Depends, UploadFile, File
 from fastapi.responses import HTMLResponse, RedirectResponse
 from fastapi.templating import Jinja2Templates
@@ -21,6 +22,7 @@ from app.core.security import generate_api_key
 from app.services.document_processor import get_document_processor
 from app.services.vector_store import get_vector_store
 from app.services.rag_service import get_rag_service
+from app.services.lookup_cache import get_lookup_cache, SCOPE_AUTH, SCOPE_ASSISTANTS
 
 settings = get_settings()
 router = APIRouter()
@@ -248,6 +250,7 @@ async def create_assistant(
     )
     db.add(assistant)
     await db.commit()
+    await get_lookup_cache().publish_invalidation(tenant.id, SCOPE_ASSISTANTS)
 
     return RedirectResponse(url=f"/portal/assistants/{assistant.id}", status_code=303)
 
@@ -341,6 +344,7 @@ async def update_assistant(
     assistant.updated_at = datetime.utcnow()
     db.add(assistant)
     await db.commit()
+    await get_lookup_cache().publish_invalidation(tenant.id, SCOPE_ASSISTANTS)
 
     return RedirectResponse(url=f"/portal/assistants/{assistant_id}", status_code=303)
 
@@ -369,6 +373,7 @@ async def toggle_assistant(
         assistant.updated_at = datetime.utcnow()
         db.add(assistant)
         await db.commit()
+        await get_lookup_cache().publish_invalidation(tenant.id, SCOPE_ASSISTANTS)
 
     return RedirectResponse(url=f"/portal/assistants/{assistant_id}", status_code=303)
 
@@ -439,9 +444,9 @@ async def upload_document(
     await db.commit()
 
     try:
-        content = await file.read()
-        chunks = processor.process_file(
-            content=content,
+        chunks = await asyncio.to_thread(
+            processor.process_file,
+            content=file.file,
             filename=file.filename,
             document_id=document_id,
             metadata={"title": title, "document_type": document_type},
@@ -594,6 +599,7 @@ async def delete_api_key(
     if api_key:
         await db.delete(api_key)
         await db.commit()
+        await get_lookup_cache().publish_invalidation(tenant.id, SCOPE_AUTH)
 
     return RedirectResponse(url="/portal/api-keys", status_code=303)
 
@@ -621,6 +627,7 @@ async def toggle_api_key(
         api_key.is_active = not api_key.is_active
         db.add(api_key)
         await db.commit()
+        await get_lookup_cache().publish_invalidation(tenant.id, SCOPE_AUTH)
 
     return RedirectResponse(url="/portal/api-keys", status_code=303)
 
@@ -29,6 +29,7 @@ from app.schemas.tenant import (
     AssistantListResponse,
 )
 from app.core.security import generate_api_key
+from app.services.lookup_cache import get_lookup_cache, SCOPE_AUTH, SCOPE_ASSISTANTS
 
 router = APIRouter()
 
@@ -125,6 +126,7 @@ async def update_tenant(
     db.add(tenant)
     await db.commit()
     await db.refresh(tenant)
+    await get_lookup_cache().publish_invalidation(tenant_id, SCOPE_AUTH)
 
     return tenant
 
@@ -150,6 +152,8 @@ async def delete_tenant(
 
     await db.delete(tenant)
     await db.commit()
+    await get_lookup_cache().publish_invalidation(tenant_id, SCOPE_AUTH)
+    await get_lookup_cache().publish_invalidation(tenant_id, SCOPE_ASSISTANTS)
 
 
 # ============== API Key Endpoints ==============
@@ -241,6 +245,7 @@ async def revoke_api_key(
     api_key.is_active = False
     db.add(api_key)
     await db.commit()
+    await get_lookup_cache().publish_invalidation(api_key.tenant_id, SCOPE_AUTH)
 
 
 # ============== Prompt Endpoints ==============
@@ -384,6 +389,7 @@ async def create_assistant(
     db.add(assistant)
     await db.commit()
     await db.refresh(assistant)
+    await get_lookup_cache().publish_invalidation(tenant_id, SCOPE_ASSISTANTS)
 
     return assistant
 
@@ -448,6 +454,7 @@ async def update_assistant(
     db.add(assistant)
     await db.commit()
     await db.refresh(assistant)
+    await get_lookup_cache().publish_invalidation(assistant.tenant_id, SCOPE_ASSISTANTS)
 
     return assistant
 
@@ -471,3 +478,4 @@ async def delete_assistant(
 
     await db.delete(assistant)
     await db.commit()
+    await get_lookup_cache().publish_invalidation(assistant.tenant_id, SCOPE_ASSISTANTS)
@@ -2,6 +2,7 @@
 Document management endpoints for uploading and managing knowledge base documents.
 Documents are tenant-isolated via Pinecone namespaces.
 """
+import asyncio
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlmodel import select
@@ -130,12 +131,10 @@ async def upload_document_file(
     await db.commit()
 
     try:
-        # Read file content
-        content = await file.read()
-
         # Process file into chunks
-        chunks = processor.process_file(
-            content=content,
+        chunks = await asyncio.to_thread(
+            processor.process_file,
+            content=file.file,
             filename=file.filename,
             document_id=document_id,
             metadata={
@@ -2,20 +2,57 @@
 Generic query endpoint for RAG-based assistant queries.
 Works with any message structure - the assistant's prompt defines the behavior.
 """
-import json
+import base64
+import msgspec
+from datetime import datetime
 from typing import Optional
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from sqlalchemy import func, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlmodel import select
 from uuid import UUID
 
+from app.core.json import dumps, loads, JSONDecodeError
 from app.deps import get_db, get_current_tenant
+from app.db.database import AsyncSessionLocal
 from app.models.tenant import Tenant, Assistant, QueryLog
-from app.schemas.evaluation import QueryRequest, QueryResponse, QueryError
+from app.schemas.evaluation import (
+    QueryRequest,
+    QueryRequestStruct,
+    QueryResponse,
+    LogListRow,
+    QueryError,
+)
 from app.services.rag_service import get_rag_service
+from app.services.lookup_cache import get_lookup_cache
 
 router = APIRouter()
 
+MAX_BATCH_SIZE = 10
+
+# Request bodies are decoded with msgspec instead of FastAPI's Pydantic path;
+# strict=False keeps Pydantic's lax coercions (e.g. "5" -> 5 for top_k).
+_query_decoder = msgspec.json.Decoder(QueryRequestStruct, strict=False)
+# Batch items are left undecoded until the batch size has been checked
+_batch_decoder = msgspec.json.Decoder(list[msgspec.Raw])
+
+# QueryRequest is only used to document the request bodies in OpenAPI
+_QUERY_REQUEST_SCHEMA = QueryRequest.model_json_schema()
+
+# Keys of a RAG result that are part of the documented /query response
+_QUERY_RESPONSE_FIELDS = tuple(QueryResponse.model_fields)
+
+
+def _request_body_docs(schema: dict) -> dict:
+    """Build openapi_extra documenting a JSON request body."""
+    return {
+        "requestBody": {
+            "required": True,
+            "content": {"application/json": {"schema": schema}},
+        }
+    }
+
 
 def _truncate(text: str, max_length: int = 500) -> str:
     """Truncate text to max length."""
@@ -24,11 +61,49 @@ def _truncate(text: str, max_length: int = 500) -> str:
     return text[:max_length] + "..."
 
 
+def _encode_cursor(created_at: datetime, log_id: UUID) -> str:
+    """Encode a /logs pagination cursor from the last row of a page."""
+    raw = f"{created_at.isoformat()}|{log_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> tuple[datetime, UUID]:
+    """Decode a /logs pagination cursor into (created_at, id)."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        created_at, log_id = raw.split("|", 1)
+        return datetime.fromisoformat(created_at), UUID(log_id)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor",
+        )
+
+
+# Columns shown in the /logs list (skips the large message/response bodies).
+# Keep in the same order as the LogListRow fields.
+LOG_LIST_COLUMNS = (
+    QueryLog.id,
+    QueryLog.query_id,
+    QueryLog.assistant_id,
+    QueryLog.message_preview,
+    QueryLog.response_preview,
+    QueryLog.knowledge_chunks_used,
+    QueryLog.cached,
+    QueryLog.processing_time_ms,
+    QueryLog.status,
+    QueryLog.error_message,
+    QueryLog.created_at,
+)
+
+_log_rows_encoder = msgspec.json.Encoder()
+
+
 async def _save_query_log(
     db: AsyncSession,
     tenant: Tenant,
     assistant: Optional[Assistant],
-    request: QueryRequest,
+    request: QueryRequestStruct,
     result: dict,
     status: str = "success",
     error_message: Optional[str] = None,
@@ -36,14 +111,14 @@ async def _save_query_log(
     """Save a query log entry."""
     # Serialize message
     if isinstance(request.message, (dict, list)):
-        message_str = json.dumps(request.message, ensure_ascii=False)
+        message_str = dumps(request.message).decode("utf-8")
     else:
         message_str = str(request.message)
 
     # Serialize response
     response = result.get("response", "")
     if isinstance(response, (dict, list)):
-        response_str = json.dumps(response, ensure_ascii=False)
+        response_str = dumps(response).decode("utf-8")
     else:
         response_str = str(response)
 
@@ -68,20 +143,29 @@ async def _save_query_log(
     await db.commit()
 
 
+async def _get_tenant_assistants(tenant: Tenant, db: AsyncSession) -> dict:
+    """Get the (cached) map of active assistants for a tenant, keyed by id and slug."""
+    lookup_cache = get_lookup_cache()
+    assistant_map = lookup_cache.get_assistants(tenant.id)
+    if assistant_map is None:
+        stmt = select(Assistant).where(
+            Assistant.tenant_id == tenant.id,
+            Assistant.is_active == True,
+        )
+        result = await db.execute(stmt)
+        assistant_map = lookup_cache.set_assistants(tenant.id, result.scalars().all())
+    return assistant_map
+
+
 async def get_assistant_for_request(
-    request: QueryRequest,
+    request: QueryRequestStruct,
     tenant: Tenant,
     db: AsyncSession,
 ) -> Assistant | None:
     """Get the assistant for a query request."""
     if request.assistant_id:
-        stmt = select(Assistant).where(
-            Assistant.id == request.assistant_id,
-            Assistant.tenant_id == tenant.id,
-            Assistant.is_active == True,
-        )
-        result = await db.execute(stmt)
-        assistant = result.scalar_one_or_none()
+        assistants = await _get_tenant_assistants(tenant, db)
+        assistant = assistants["id"].get(request.assistant_id)
         if not assistant:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -90,13 +174,8 @@ async def get_assistant_for_request(
         return assistant
 
     if request.assistant_slug:
-        stmt = select(Assistant).where(
-            Assistant.slug == request.assistant_slug,
-            Assistant.tenant_id == tenant.id,
-            Assistant.is_active == True,
-        )
-        result = await db.execute(stmt)
-        assistant = result.scalar_one_or_none()
+        assistants = await _get_tenant_assistants(tenant, db)
+        assistant = assistants["slug"].get(request.assistant_slug)
         if not assistant:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -107,17 +186,59 @@ async def get_assistant_for_request(
     return None
 
 
+def _invalid_body(e: msgspec.DecodeError) -> HTTPException:
+    """Map a msgspec decoding error to a 422 response."""
+    return HTTPException(
+        status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+        detail=f"Invalid request body: {e}",
+    )
+
+
+async def decode_query_request(http_request: Request) -> QueryRequestStruct:
+    """Decode a /query body."""
+    try:
+        return _query_decoder.decode(await http_request.body())
+    except msgspec.DecodeError as e:
+        raise _invalid_body(e)
+
+
+async def decode_batch_requests(http_request: Request) -> list[QueryRequestStruct]:
+    """
+    Decode a /query/batch body.
+
+    Declared as the first parameter of the endpoint so oversized batches
+    are rejected before authentication runs or any item is decoded.
+    """
+    try:
+        items = _batch_decoder.decode(await http_request.body())
+    except msgspec.DecodeError as e:
+        raise _invalid_body(e)
+
+    if len(items) > MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Maximum {MAX_BATCH_SIZE} queries per batch request",
+        )
+
+    try:
+        return [_query_decoder.decode(item) for item in items]
+    except msgspec.DecodeError as e:
+        raise _invalid_body(e)
+
+
 @router.post(
     "/query",
     response_model=QueryResponse,
+    response_class=ORJSONResponse,
     responses={
         400: {"model": QueryError},
         401: {"description": "Invalid API key"},
         500: {"model": QueryError},
     },
+    openapi_extra=_request_body_docs(_QUERY_REQUEST_SCHEMA),
 )
 async def query_assistant(
-    request: QueryRequest,
+    request: QueryRequestStruct = Depends(decode_query_request),
     tenant: Tenant = Depends(get_current_tenant),
     db: AsyncSession = Depends(get_db),
 ):
@@ -144,6 +265,9 @@ async def query_assistant(
     # Get assistant if specified
     assistant = await get_assistant_for_request(request, tenant, db)
 
+    # Return the connection to the pool while the LLM call runs
+    await db.commit()
+
     rag_service = get_rag_service()
 
     try:
@@ -162,7 +286,11 @@ async def query_assistant(
         except Exception:
             pass  # Logging failure shouldn't break the response
 
-        return QueryResponse(**result)
+        # The RAG result already has the response shape; returning a response
+        # directly skips re-validating it through QueryResponse
+        return ORJSONResponse(
+            {key: result[key] for key in _QUERY_RESPONSE_FIELDS if key in result}
+        )
 
     except Exception as e:
         # Try to log the error
@@ -182,6 +310,81 @@ async def query_assistant(
         )
 
 
+def _sse_event(event: str, data: dict) -> bytes:
+    """Format a server-sent event."""
+    return b"event: " + event.encode() + b"\ndata: " + dumps(data) + b"\n\n"
+
+
+@router.post(
+    "/query/stream",
+    responses={
+        200: {"content": {"text/event-stream": {}}},
+        401: {"description": "Invalid API key"},
+    },
+    openapi_extra=_request_body_docs(_QUERY_REQUEST_SCHEMA),
+)
+async def stream_query_assistant(
+    request: QueryRequestStruct = Depends(decode_query_request),
+    tenant: Tenant = Depends(get_current_tenant),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Send a query to an assistant and stream the response as it's generated.
+
+    Same request body and behavior as /query, returned as server-sent events:
+    - "delta": {"text": ...} for each piece of generated text
+    - "done": the same object /query returns (the only event on a cache hit)
+    - "error": {"detail": ...} if the query fails mid-stream
+    """
+    assistant = await get_assistant_for_request(request, tenant, db)
+
+    # The request session is closed before the body is streamed
+    await db.commit()
+
+    rag_service = get_rag_service()
+
+    async def event_stream():
+        """Relay RAG events as SSE and log the query once it finishes."""
+        result = None
+        error_message = None
+        try:
+            async for event in rag_service.stream_query(
+                tenant=tenant,
+                message=request.message,
+                instructions=request.instructions,
+                search_query=request.search_query,
+                top_k=request.top_k,
+                assistant=assistant,
+            ):
+                if event["type"] == "delta":
+                    yield _sse_event("delta", {"text": event["text"]})
+                else:
+                    result = event["result"]
+                    yield _sse_event("done", {
+                        key: result[key] for key in _QUERY_RESPONSE_FIELDS if key in result
+                    })
+        except Exception as e:
+            error_message = str(e)
+            yield _sse_event("error", {"detail": f"Query failed: {error_message}"})
+
+        # Save log (don't fail if logging fails)
+        try:
+            async with AsyncSessionLocal() as session:
+                if result is not None:
+                    await _save_query_log(session, tenant, assistant, request, result)
+                elif error_message is not None:
+                    await _save_query_log(
+                        session, tenant, assistant, request,
+                        {"query_id": "error"},
+                        status="error",
+                        error_message=error_message,
+                    )
+        except Exception:
+            pass
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
+
 @router.post("/query/search")
 async def search_knowledge_base(
     query: str,
@@ -203,9 +406,16 @@ async def search_knowledge_base(
     return result
 
 
-@router.post("/query/batch")
+@router.post(
+    "/query/batch",
+    openapi_extra=_request_body_docs({
+        "type": "array",
+        "items": _QUERY_REQUEST_SCHEMA,
+        "maxItems": MAX_BATCH_SIZE,
+    }),
+)
 async def batch_query(
-    requests: list[QueryRequest],
+    requests: list[QueryRequestStruct] = Depends(decode_batch_requests),
     tenant: Tenant = Depends(get_current_tenant),
     db: AsyncSession = Depends(get_db),
 ):
@@ -215,11 +425,11 @@ async def batch_query(
 
     Note: For large batches, consider implementing a queue-based system.
     """
-    if len(requests) > 10:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Maximum 10 queries per batch request",
-        )
+    # Load the tenant's assistants once, then return the connection to the
+    # pool so it is not held idle across the sequential LLM calls
+    if any(r.assistant_id or r.assistant_slug for r in requests):
+        await _get_tenant_assistants(tenant, db)
+    await db.commit()
 
     rag_service = get_rag_service()
     results = []
@@ -291,68 +501,112 @@ async def list_tenant_assistants(
 async def list_query_logs(
     limit: int = Query(default=50, ge=1, le=200),
     offset: int = Query(default=0, ge=0),
+    cursor: Optional[str] = Query(default=None),
+    include_total: bool = Query(default=False),
     status_filter: Optional[str] = Query(default=None, alias="status"),
     assistant_id: Optional[UUID] = Query(default=None),
     tenant: Tenant = Depends(get_current_tenant),
-    db: AsyncSession = Depends(get_db),
 ):
     """
     List query logs for the current tenant.
 
     Logs include request/response previews and metadata.
     Use query_id to get full details of a specific log.
-    """
-    # Build query
-    stmt = select(QueryLog).where(QueryLog.tenant_id == tenant.id)
 
-    if status_filter:
-        stmt = stmt.where(QueryLog.status == status_filter)
+    Pagination is keyset-based: pass the returned next_cursor to fetch the
+    following page. offset is still accepted for older clients but gets
+    slower the deeper it goes. The total count is only computed when
+    include_total=true.
 
-    if assistant_id:
-        stmt = stmt.where(QueryLog.assistant_id == assistant_id)
-
-    # Order by newest first
-    stmt = stmt.order_by(QueryLog.created_at.desc())
-
-    # Count total
-    count_stmt = select(QueryLog).where(QueryLog.tenant_id == tenant.id)
+    Rows are streamed, so a database failure partway through can't change
+    the 200 status; the body is still closed as valid JSON and carries an
+    "error" key, with the rows sent so far and no next_cursor.
+    """
+    filters = [QueryLog.tenant_id == tenant.id]
     if status_filter:
-        count_stmt = count_stmt.where(QueryLog.status == status_filter)
+        filters.append(QueryLog.status == status_filter)
     if assistant_id:
-        count_stmt = count_stmt.where(QueryLog.assistant_id == assistant_id)
+        filters.append(QueryLog.assistant_id == assistant_id)
+
+    columns = LOG_LIST_COLUMNS
+    if include_total:
+        # count(*) OVER () returns the total with every row, in the same scan
+        columns = (*columns, func.count().over().label("total"))
+    stmt = select(*columns).where(*filters)
+
+    if cursor:
+        cursor_created_at, cursor_id = _decode_cursor(cursor)
+        if include_total:
+            # Count over the filtered rows before the cursor narrows them down
+            counted = stmt.subquery()
+            stmt = select(counted)
+            created_at_col, id_col = counted.c.created_at, counted.c.id
+        else:
+            created_at_col, id_col = QueryLog.created_at, QueryLog.id
+        stmt = stmt.where(
+            tuple_(created_at_col, id_col) < tuple_(cursor_created_at, cursor_id)
+        )
+    else:
+        created_at_col, id_col = QueryLog.created_at, QueryLog.id
+        if offset:
+            stmt = stmt.offset(offset)
 
-    count_result = await db.execute(count_stmt)
-    total = len(count_result.scalars().all())
+    # Newest first, id breaks ties between rows with the same timestamp
+    stmt = stmt.order_by(created_at_col.desc(), id_col.desc()).limit(limit)
 
-    # Apply pagination
-    stmt = stmt.offset(offset).limit(limit)
-    result = await db.execute(stmt)
-    logs = result.scalars().all()
+    async def stream_logs():
+        """Stream the page as JSON without holding every row in memory."""
+        n_columns = len(LOG_LIST_COLUMNS)
+        count = 0
+        last_row = None
+        total = 0
 
-    return {
-        "logs": [
-            {
-                "id": str(log.id),
-                "query_id": log.query_id,
-                "assistant_id": str(log.assistant_id) if log.assistant_id else None,
-                "message_preview": log.message_preview,
-                "response_preview": log.response_preview,
-                "knowledge_chunks_used": log.knowledge_chunks_used,
-                "cached": log.cached,
-                "processing_time_ms": log.processing_time_ms,
-                "status": log.status,
-                "error_message": log.error_message,
-                "created_at": log.created_at.isoformat(),
+        yield b'{"logs":['
+        try:
+            async with AsyncSessionLocal() as session:
+                result = await session.stream(stmt.execution_options(yield_per=50))
+                async for partition in result.partitions():
+                    rows = [LogListRow(*row[:n_columns]) for row in partition]
+                    if include_total:
+                        total = partition[-1][n_columns]
+                    if count:
+                        yield b","
+                    # Encode the whole partition in one call and drop the brackets
+                    yield _log_rows_encoder.encode(rows)[1:-1]
+                    count += len(rows)
+                    last_row = rows[-1]
+
+                # An empty page past the end carries no window count
+                if include_total and not count and (cursor or offset):
+                    count_stmt = select(func.count()).select_from(QueryLog).where(*filters)
+                    total = (await session.execute(count_stmt)).scalar_one()
+        except Exception as e:
+            # The status line is already sent; close the JSON with an error
+            # marker so the client can tell the page is incomplete
+            print(f"Warning: Could not stream query logs: {e}")
+            error_tail = {
+                "error": "Failed to load query logs",
+                "limit": limit,
+                "offset": offset,
+                "next_cursor": None,
             }
-            for log in logs
-        ],
-        "total": total,
-        "limit": limit,
-        "offset": offset,
-    }
+            yield b"]," + dumps(error_tail)[1:]
+            return
+
+        next_cursor = None
+        if count == limit:
+            next_cursor = _encode_cursor(last_row.created_at, last_row.id)
+
+        tail = {"limit": limit, "offset": offset, "next_cursor": next_cursor}
+        if include_total:
+            tail["total"] = total
+        # Splice the remaining keys into the open object: '],' + '"limit":...}'
+        yield b"]," + dumps(tail)[1:]
+
+    return StreamingResponse(stream_logs(), media_type="application/json")
 
 
-@router.get("/logs/{query_id}")
+@router.get("/logs/{query_id}", response_class=ORJSONResponse)
 async def get_query_log_detail(
     query_id: str,
     tenant: Tenant = Depends(get_current_tenant),
@@ -363,12 +617,18 @@ async def get_query_log_detail(
 
     Includes complete message and response (not truncated).
     """
-    stmt = select(QueryLog).where(
-        QueryLog.tenant_id == tenant.id,
-        QueryLog.query_id == query_id,
+    # Error logs share the "error" query_id, so stop at the first match
+    stmt = (
+        select(QueryLog)
+        .where(
+            QueryLog.tenant_id == tenant.id,
+            QueryLog.query_id == query_id,
+        )
+        .order_by(QueryLog.created_at.desc())
+        .limit(1)
     )
     result = await db.execute(stmt)
-    log = result.scalar_one_or_none()
+    log = result.scalars().first()
 
     if not log:
         raise HTTPException(
@@ -378,20 +638,20 @@ async def get_query_log_detail(
 
     # Parse JSON fields if possible
     try:
-        message = json.loads(log.message_full) if log.message_full else None
-    except json.JSONDecodeError:
+        message = loads(log.message_full) if log.message_full else None
+    except JSONDecodeError:
         message = log.message_full
 
     try:
-        response = json.loads(log.response_full) if log.response_full else None
-    except json.JSONDecodeError:
+        response = loads(log.response_full) if log.response_full else None
+    except JSONDecodeError:
         response = log.response_full
 
-    return {
-        "id": str(log.id),
+    return ORJSONResponse({
+        "id": log.id,
         "query_id": log.query_id,
-        "tenant_id": str(log.tenant_id),
-        "assistant_id": str(log.assistant_id) if log.assistant_id else None,
+        "tenant_id": log.tenant_id,
+        "assistant_id": log.assistant_id,
         "message": message,
         "search_query": log.search_query,
         "top_k": log.top_k,
@@ -401,5 +661,5 @@ async def get_query_log_detail(
         "processing_time_ms": log.processing_time_ms,
         "status": log.status,
         "error_message": log.error_message,
-        "created_at": log.created_at.isoformat(),
-    }
+        "created_at": log.created_at,
+    })
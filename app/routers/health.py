@@ -1,14 +1,30 @@
 """Health check endpoints."""
-from fastapi import APIRouter, Depends
-from sqlalchemy.ext.asyncio import AsyncSession
+import asyncio
+from fastapi import APIRouter
+from sqlalchemy import text
 
-from app.deps import get_db
+from app.db.database import async_engine, health_engine
 from app.db.redis import get_redis
 from app.config import get_settings
 
 router = APIRouter()
 settings = get_settings()
 
+# Max seconds to wait on each dependency before reporting it unhealthy
+HEALTH_CHECK_TIMEOUT = 0.5
+
+
+async def _ping_database():
+    """Run a trivial query on the dedicated health engine."""
+    async with health_engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+
+
+async def _ping_redis():
+    """Ping Redis."""
+    redis = await get_redis()
+    await redis.ping()
+
 
 @router.get("/health")
 async def health_check():
@@ -17,9 +33,7 @@ async def health_check():
 
 
 @router.get("/health/detailed")
-async def detailed_health_check(
-    db: AsyncSession = Depends(get_db),
-):
+async def detailed_health_check():
     """
     Detailed health check including database and Redis status.
     """
@@ -34,17 +48,30 @@ async def detailed_health_check(
 
     # Check database
     try:
-        await db.execute("SELECT 1")
+        await asyncio.wait_for(_ping_database(), timeout=HEALTH_CHECK_TIMEOUT)
         health_status["services"]["database"] = "healthy"
+    except asyncio.TimeoutError:
+        health_status["services"]["database"] = "unhealthy: timeout"
+        health_status["status"] = "degraded"
     except Exception as e:
         health_status["services"]["database"] = f"unhealthy: {str(e)}"
         health_status["status"] = "degraded"
 
+    # Request pool usage (alert before checkouts hit pool_timeout)
+    pool = async_engine.pool
+    health_status["database_pool"] = {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow(),
+    }
+
     # Check Redis
     try:
-        redis = await get_redis()
-        await redis.ping()
+        await asyncio.wait_for(_ping_redis(), timeout=HEALTH_CHECK_TIMEOUT)
         health_status["services"]["redis"] = "healthy"
+    except asyncio.TimeoutError:
+        health_status["services"]["redis"] = "unhealthy: timeout"
+        health_status["status"] = "degraded"
     except Exception as e:
         health_status["services"]["redis"] = f"unhealthy: {str(e)}"
         health_status["status"] = "degraded"
@@ -1,5 +1,5 @@
 """Pydantic schemas for document-related operations."""
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from datetime import datetime
 from uuid import UUID
 from typing import Optional
@@ -17,8 +17,8 @@ class DocumentCreate(BaseModel):
     content: str = Field(..., min_length=1, description="Text content to process")
     source: Optional[str] = Field(None, description="Original source/URL")
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "title": "Competencia de Liderazgo",
                 "document_type": "competency",
@@ -26,6 +26,7 @@ class DocumentCreate(BaseModel):
                 "source": "Manual de competencias v2.0",
             }
         }
+    )
 
 
 class DocumentUploadResponse(BaseModel):
@@ -39,8 +40,7 @@ class DocumentUploadResponse(BaseModel):
     status: str
     created_at: datetime
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class DocumentResponse(BaseModel):
@@ -58,8 +58,7 @@ class DocumentResponse(BaseModel):
     created_at: datetime
     updated_at: datetime
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class DocumentListResponse(BaseModel):
@@ -1,6 +1,8 @@
 """Pydantic schemas for API requests/responses."""
-from pydantic import BaseModel, Field
-from typing import Optional, Any, Dict
+import msgspec
+from datetime import datetime
+from pydantic import BaseModel, ConfigDict, Field
+from typing import Annotated, Optional, Any, Dict
 from uuid import UUID
 
 
@@ -40,8 +42,8 @@ class QueryRequest(BaseModel):
         description="Number of knowledge base chunks to retrieve"
     )
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "assistant_slug": "evaluador-liderazgo",
                 "message": {
@@ -60,6 +62,43 @@ class QueryRequest(BaseModel):
                 "top_k": 5
             }
         }
+    )
+
+
+class QueryRequestStruct(msgspec.Struct, kw_only=True):
+    """
+    msgspec mirror of QueryRequest used to decode request bodies.
+
+    QueryRequest stays the documented schema; keep the two in sync.
+    """
+
+    assistant_id: Optional[UUID] = None
+    assistant_slug: Optional[str] = None
+    message: Any
+    instructions: Optional[str] = None
+    search_query: Optional[str] = None
+    top_k: Annotated[int, msgspec.Meta(ge=1, le=20)] = 5
+
+
+class LogListRow(msgspec.Struct):
+    """
+    Row of the /logs list, encoded directly by msgspec.
+
+    Field order matches LOG_LIST_COLUMNS in the evaluate router so rows can
+    be built positionally.
+    """
+
+    id: UUID
+    query_id: str
+    assistant_id: Optional[UUID]
+    message_preview: str
+    response_preview: str
+    knowledge_chunks_used: int
+    cached: bool
+    processing_time_ms: int
+    status: str
+    error_message: Optional[str]
+    created_at: datetime
 
 
 class QueryResponse(BaseModel):
@@ -78,8 +117,8 @@ class QueryResponse(BaseModel):
     cached: bool = Field(default=False, description="Whether response was served from cache")
     processing_time_ms: int = Field(..., description="Processing time in milliseconds")
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "query_id": "q-abc123",
                 "tenant_id": "550e8400-e29b-41d4-a716-446655440000",
@@ -96,6 +135,7 @@ class QueryResponse(BaseModel):
                 "processing_time_ms": 1234
             }
         }
+    )
 
 
 class QueryError(BaseModel):
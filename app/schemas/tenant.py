@@ -1,5 +1,5 @@
 """Pydantic schemas for tenant-related operations."""
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from datetime import datetime
 from uuid import UUID
 from typing import Optional
@@ -14,14 +14,15 @@ class TenantCreate(BaseModel):
     slug: str = Field(..., min_length=1, max_length=100, pattern=r"^[a-z0-9-]+$")
     description: Optional[str] = None
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "name": "Universidad XYZ",
                 "slug": "universidad-xyz",
                 "description": "Tenant para Universidad XYZ",
             }
         }
+    )
 
 
 class TenantUpdate(BaseModel):
@@ -43,8 +44,7 @@ class TenantResponse(BaseModel):
     created_at: datetime
     updated_at: datetime
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class TenantListResponse(BaseModel):
@@ -62,13 +62,14 @@ class APIKeyCreate(BaseModel):
     name: str = Field(default="default", max_length=100)
     expires_at: Optional[datetime] = None
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "name": "production",
                 "expires_at": None,
             }
         }
+    )
 
 
 class APIKeyResponse(BaseModel):
@@ -82,8 +83,7 @@ class APIKeyResponse(BaseModel):
     last_used_at: Optional[datetime]
     expires_at: Optional[datetime]
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class APIKeyCreatedResponse(BaseModel):
@@ -118,14 +118,15 @@ class TenantPromptCreate(BaseModel):
     name: str = Field(default="default", max_length=100)
     content: str = Field(..., min_length=1)
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "prompt_type": "system",
                 "name": "default",
                 "content": "Eres un evaluador experto en competencias blandas...",
             }
         }
+    )
 
 
 class TenantPromptUpdate(BaseModel):
@@ -148,8 +149,7 @@ class TenantPromptResponse(BaseModel):
     created_at: datetime
     updated_at: datetime
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class TenantPromptListResponse(BaseModel):
@@ -173,8 +173,8 @@ class AssistantCreate(BaseModel):
     model: str = Field(default="claude-sonnet-4-20250514")
     temperature: float = Field(default=0.0, ge=0.0, le=1.0)
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "name": "Evaluador de Liderazgo",
                 "slug": "evaluador-liderazgo",
@@ -184,6 +184,7 @@ class AssistantCreate(BaseModel):
                 "temperature": 0.0,
             }
         }
+    )
 
 
 class AssistantUpdate(BaseModel):
@@ -214,8 +215,7 @@ class AssistantResponse(BaseModel):
     created_at: datetime
     updated_at: datetime
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class AssistantListResponse(BaseModel):
@@ -2,15 +2,48 @@
 Cache service using Redis for query results.
 Provides deterministic responses for identical inputs.
 """
-import json
 import hashlib
+from functools import lru_cache
 from typing import Optional, Dict, Any
 
+import msgspec
+from cachetools import TTLCache
+
+from app.core.json import loads
 from app.db.redis import get_redis
 from app.config import get_settings
 
 settings = get_settings()
 
+# Keys requested per SCAN call and keys per UNLINK command
+SCAN_COUNT = 1000
+UNLINK_BATCH_SIZE = 500
+
+# Cached results are MessagePack prefixed with this version byte; values
+# without it are JSON written by earlier versions
+PAYLOAD_MSGPACK = b"\x01"
+_payload_encoder = msgspec.msgpack.Encoder()
+_payload_decoder = msgspec.msgpack.Decoder()
+
+# In-process layer in front of Redis for the hottest results. Entries live
+# at most this long, which bounds how stale another worker's copy can be
+# after an invalidation.
+LOCAL_CACHE_MAXSIZE = 10_000
+LOCAL_CACHE_MAX_TTL_SECONDS = 300
+
+
+@lru_cache(maxsize=1024)
+def _cache_key_parts(prefix: str, tenant_id: str, cache_key_suffix: str) -> tuple[bytes, bytes]:
+    """Encoded head ("prefix:tenant_id:") and tail (suffix) of a cache key."""
+    return f"{prefix}:{tenant_id}:".encode(), cache_key_suffix.encode()
+
+
+def _decode_payload(payload: bytes) -> Dict[str, Any]:
+    """Decode a cached result (MessagePack, or JSON from older entries)."""
+    if payload[:1] == PAYLOAD_MSGPACK:
+        return _payload_decoder.decode(memoryview(payload)[1:])
+    return loads(payload)
+
 
 class CacheService:
     """Service for caching query results in Redis."""
@@ -18,13 +51,29 @@ class CacheService:
     def __init__(self):
         self.ttl = settings.cache_ttl_seconds
         self.prefix = "query"
+        self._redis = None
+        # cache key -> decoded result dict
+        self._local: TTLCache = TTLCache(
+            maxsize=LOCAL_CACHE_MAXSIZE,
+            ttl=min(self.ttl, LOCAL_CACHE_MAX_TTL_SECONDS),
+        )
+
+    async def _client(self):
+        """Get the shared Redis client, resolved once on first use."""
+        if self._redis is None:
+            self._redis = await get_redis()
+        return self._redis
+
+    def _stats_key(self, tenant_id: str) -> str:
+        """Key holding the approximate number of cached results for a tenant."""
+        return f"{self.prefix}:stats:{tenant_id}"
 
     def _generate_cache_key(
         self,
         tenant_id: str,
         content_hash: str,
         cache_key_suffix: str = "",
-    ) -> str:
+    ) -> bytes:
         """
         Generate a unique cache key for a query request.
 
@@ -34,9 +83,10 @@ class CacheService:
             cache_key_suffix: Optional suffix (e.g., assistant_id)
 
         Returns:
-            A unique cache key string
+            A unique cache key (bytes, passed to Redis as-is)
         """
-        return f"{self.prefix}:{tenant_id}:{content_hash}{cache_key_suffix}"
+        head, tail = _cache_key_parts(self.prefix, tenant_id, cache_key_suffix)
+        return head + content_hash.encode() + tail
 
     async def get_cached_result(
         self,
@@ -53,14 +103,20 @@ class CacheService:
             cache_key_suffix: Optional suffix (e.g., assistant_id)
 
         Returns:
-            Cached result or None
+            Cached result or None (a copy the caller may modify)
         """
-        redis = await get_redis()
         cache_key = self._generate_cache_key(tenant_id, content_hash, cache_key_suffix)
 
+        cached = self._local.get(cache_key)
+        if cached is not None:
+            return dict(cached)
+
+        redis = await self._client()
         cached = await redis.get(cache_key)
         if cached:
-            return json.loads(cached)
+            result = _decode_payload(cached)
+            self._local[cache_key] = result
+            return dict(result)
         return None
 
     async def cache_result(
@@ -82,14 +138,27 @@ class CacheService:
         Returns:
             True if cached successfully
         """
-        redis = await get_redis()
+        redis = await self._client()
         cache_key = self._generate_cache_key(tenant_id, content_hash, cache_key_suffix)
 
-        await redis.setex(
-            cache_key,
-            self.ttl,
-            json.dumps(result, ensure_ascii=False),
-        )
+        stats_key = self._stats_key(tenant_id)
+
+        # One round-trip, no script: results are deterministic, so an
+        # existing entry is left as is. The counter is approximate -- it
+        # over-counts if two workers store the same key at once and isn't
+        # decremented when entries expire -- and is reset on invalidation.
+        async with redis.pipeline(transaction=False) as pipe:
+            pipe.set(
+                cache_key,
+                PAYLOAD_MSGPACK + _payload_encoder.encode(result),
+                ex=self.ttl,
+                nx=True,
+            )
+            pipe.incr(stats_key)
+            # Expires together with the newest entry
+            pipe.expire(stats_key, self.ttl)
+            await pipe.execute()
+        self._local[cache_key] = dict(result)
         return True
 
     async def invalidate_tenant_cache(self, tenant_id: str) -> int:
@@ -103,22 +172,48 @@ class CacheService:
         Returns:
             Number of keys deleted
         """
-        redis = await get_redis()
+        # Drop this process's copies; other workers' expire on their own
+        head, _ = _cache_key_parts(self.prefix, tenant_id, "")
+        for cache_key in [key for key in self._local if key.startswith(head)]:
+            self._local.pop(cache_key, None)
+
+        redis = await self._client()
         pattern = f"{self.prefix}:{tenant_id}:*"
 
-        # Use SCAN to find and delete keys (safer than KEYS for large datasets)
+        # Use SCAN to find keys (safer than KEYS for large datasets) and
+        # UNLINK them so Redis frees the memory off its main thread
         deleted = 0
+        pending = []
         cursor = 0
         while True:
-            cursor, keys = await redis.scan(cursor, match=pattern, count=100)
-            if keys:
-                await redis.delete(*keys)
-                deleted += len(keys)
+            cursor, keys = await redis.scan(cursor, match=pattern, count=SCAN_COUNT)
+            pending.extend(keys)
+            if len(pending) >= SCAN_COUNT or (cursor == 0 and pending):
+                deleted += await self._unlink_keys(redis, pending)
+                pending = []
             if cursor == 0:
                 break
 
+        await redis.delete(self._stats_key(tenant_id))
         return deleted
 
+    async def _unlink_keys(self, redis, keys: list) -> int:
+        """
+        Unlink keys in batches, sending all batches in a single round-trip.
+
+        Args:
+            redis: The Redis client
+            keys: Keys to unlink
+
+        Returns:
+            Number of keys removed
+        """
+        async with redis.pipeline(transaction=False) as pipe:
+            for i in range(0, len(keys), UNLINK_BATCH_SIZE):
+                pipe.unlink(*keys[i:i + UNLINK_BATCH_SIZE])
+            results = await pipe.execute()
+        return sum(results)
+
     async def get_cache_stats(self, tenant_id: str) -> Dict[str, Any]:
         """
         Get cache statistics for a tenant.
@@ -129,17 +224,11 @@ class CacheService:
         Returns:
             Dict with cache statistics
         """
-        redis = await get_redis()
-        pattern = f"{self.prefix}:{tenant_id}:*"
+        redis = await self._client()
 
-        # Count keys
-        count = 0
-        cursor = 0
-        while True:
-            cursor, keys = await redis.scan(cursor, match=pattern, count=100)
-            count += len(keys)
-            if cursor == 0:
-                break
+        # Maintained by cache_result, so this is a single GET instead of a
+        # scan over the tenant's keys (approximate, see cache_result)
+        count = int(await redis.get(self._stats_key(tenant_id)) or 0)
 
         return {
             "tenant_id": tenant_id,
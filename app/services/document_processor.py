@@ -1,15 +1,23 @@
 """
 Document processing service for chunking and preparing documents for vector storage.
 """
-from typing import List, Dict, Any, Optional
-from dataclasses import dataclass
+from typing import List, Dict, Any, Optional, BinaryIO, Iterator, Union
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
 from uuid import uuid4
 import io
-import json
+import multiprocessing
+import os
 
-from langchain.text_splitter import RecursiveCharacterTextSplitter
+from app.core.json import loads
+from app.core.text_splitter import TextSplitter
 
 # PDF and DOCX processing
+try:
+    import fitz  # PyMuPDF: faster extraction, releases the GIL
+except ImportError:
+    fitz = None
+
 try:
     from pypdf import PdfReader
 except ImportError:
@@ -21,6 +29,94 @@ except ImportError:
     DocxDocument = None
 
 
+# With pypdf, PDFs with at least this many pages are extracted in parallel
+PDF_PARALLEL_MIN_PAGES = 32
+PDF_MAX_WORKERS = min(4, os.cpu_count() or 1)
+
+_pdf_pool: ProcessPoolExecutor | None = None
+
+# Uploaded file content: raw bytes, or a binary file object such as
+# UploadFile.file (read in place instead of copied into memory first)
+FileContent = Union[bytes, BinaryIO]
+
+
+def _as_stream(content: FileContent) -> BinaryIO:
+    """Get a seekable binary stream positioned at the start of the content."""
+    if isinstance(content, bytes):
+        return io.BytesIO(content)
+    content.seek(0)
+    return content
+
+
+def _as_bytes(content: FileContent) -> bytes:
+    """Get the content as bytes (reads file objects in full)."""
+    if isinstance(content, bytes):
+        return content
+    content.seek(0)
+    return content.read()
+
+
+def _get_pdf_pool() -> ProcessPoolExecutor:
+    """Get the process pool used for parallel pypdf extraction."""
+    global _pdf_pool
+    if _pdf_pool is None:
+        # spawn: forking a process that runs an event loop and threads is unsafe
+        _pdf_pool = ProcessPoolExecutor(
+            max_workers=PDF_MAX_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _pdf_pool
+
+
+def _extract_pdf_page_range(pdf_content: bytes, start: int, stop: int) -> List[str]:
+    """Extract the text of pages [start, stop) with pypdf (runs in a worker process)."""
+    reader = PdfReader(io.BytesIO(pdf_content))
+    return [reader.pages[i].extract_text() for i in range(start, stop)]
+
+
+def extract_pdf_pages(pdf_content: FileContent) -> List[str]:
+    """
+    Extract the text of every page of a PDF.
+
+    Uses PyMuPDF when installed. Otherwise uses pypdf, splitting large
+    documents into page ranges extracted in separate processes, since
+    pypdf's extraction is CPU-bound Python code.
+
+    Args:
+        pdf_content: Raw PDF bytes or a binary file object
+
+    Returns:
+        List of page texts, in page order
+    """
+    if fitz is not None:
+        with fitz.open(stream=_as_bytes(pdf_content), filetype="pdf") as doc:
+            return [page.get_text() for page in doc]
+
+    if PdfReader is None:
+        raise ImportError("pypdf or pymupdf is required for PDF processing")
+
+    # pypdf reads file objects lazily, so small PDFs are never copied
+    reader = PdfReader(_as_stream(pdf_content))
+    total_pages = len(reader.pages)
+    if total_pages < PDF_PARALLEL_MIN_PAGES or PDF_MAX_WORKERS == 1:
+        return [page.extract_text() for page in reader.pages]
+
+    # Worker processes need the bytes themselves
+    pdf_content = _as_bytes(pdf_content)
+
+    range_size = -(-total_pages // PDF_MAX_WORKERS)
+    starts = list(range(0, total_pages, range_size))
+    stops = [min(start + range_size, total_pages) for start in starts]
+    pool = _get_pdf_pool()
+    page_ranges = pool.map(
+        _extract_pdf_page_range,
+        [pdf_content] * len(starts),
+        starts,
+        stops,
+    )
+    return [text for page_range in page_ranges for text in page_range]
+
+
 @dataclass
 class DocumentChunk:
     """A chunk of a processed document."""
@@ -30,6 +126,28 @@ class DocumentChunk:
     metadata: Dict[str, Any]
 
 
+@dataclass
+class ChunkBatch:
+    """
+    The chunks of a processed document, stored column-wise.
+
+    Ingestion works on whole columns (contents go to the embedder, ids and
+    metadata to the vector store), so no per-chunk object is allocated.
+    Iterating yields DocumentChunk views for code that wants rows.
+    """
+
+    ids: List[str] = field(default_factory=list)
+    contents: List[str] = field(default_factory=list)
+    metadatas: List[Dict[str, Any]] = field(default_factory=list)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __iter__(self) -> Iterator[DocumentChunk]:
+        for chunk_id, content, metadata in zip(self.ids, self.contents, self.metadatas):
+            yield DocumentChunk(id=chunk_id, content=content, metadata=metadata)
+
+
 class DocumentProcessor:
     """
     Processes documents into chunks suitable for vector storage.
@@ -46,11 +164,10 @@ class DocumentProcessor:
         chunk_size: int = 1000,
         chunk_overlap: int = 200,
     ):
-        self.text_splitter = RecursiveCharacterTextSplitter(
+        self.text_splitter = TextSplitter(
             chunk_size=chunk_size,
             chunk_overlap=chunk_overlap,
-            length_function=len,
-            separators=["\n\n", "\n", ". ", " ", ""],
+            separators=["\n\n", "\n", ". ", " "],
         )
 
     def process_text(
@@ -58,7 +175,7 @@ class DocumentProcessor:
         text: str,
         document_id: str,
         metadata: Optional[Dict[str, Any]] = None,
-    ) -> List[DocumentChunk]:
+    ) -> ChunkBatch:
         """
         Process plain text into chunks.
 
@@ -68,104 +185,91 @@ class DocumentProcessor:
             metadata: Additional metadata to attach to chunks
 
         Returns:
-            List of DocumentChunk objects
+            ChunkBatch with the document's chunks
         """
         if not text.strip():
-            return []
+            return ChunkBatch()
 
-        base_metadata = metadata or {}
         chunks = self.text_splitter.split_text(text)
-
-        return [
-            DocumentChunk(
-                id=f"{document_id}_chunk_{i}",
-                content=chunk,
-                metadata={
-                    **base_metadata,
-                    "document_id": document_id,
-                    "chunk_index": i,
-                    "total_chunks": len(chunks),
-                },
-            )
-            for i, chunk in enumerate(chunks)
-        ]
+        base_metadata = {**(metadata or {}), "document_id": document_id}
+        total_chunks = len(chunks)
+
+        return ChunkBatch(
+            ids=[f"{document_id}_chunk_{i}" for i in range(total_chunks)],
+            contents=chunks,
+            metadatas=[
+                {**base_metadata, "chunk_index": i, "total_chunks": total_chunks}
+                for i in range(total_chunks)
+            ],
+        )
 
     def process_pdf(
         self,
-        pdf_content: bytes,
+        pdf_content: FileContent,
         document_id: str,
         metadata: Optional[Dict[str, Any]] = None,
-    ) -> List[DocumentChunk]:
+    ) -> ChunkBatch:
         """
         Process a PDF file into chunks.
 
         Args:
-            pdf_content: Raw PDF bytes
+            pdf_content: Raw PDF bytes or a binary file object
             document_id: Unique identifier for the document
             metadata: Additional metadata to attach to chunks
 
         Returns:
-            List of DocumentChunk objects
+            ChunkBatch with the document's chunks
         """
-        if PdfReader is None:
-            raise ImportError("pypdf is required for PDF processing")
-
-        reader = PdfReader(io.BytesIO(pdf_content))
+        page_texts = extract_pdf_pages(pdf_content)
         base_metadata = metadata or {}
+        total_pages = len(page_texts)
 
-        all_chunks = []
-        for page_num, page in enumerate(reader.pages):
-            page_text = page.extract_text()
+        # Split every page first so total_chunks is known when building metadata
+        batch = ChunkBatch()
+        page_metadatas = []
+        for page_num, page_text in enumerate(page_texts, start=1):
             if not page_text.strip():
                 continue
 
             page_metadata = {
                 **base_metadata,
-                "page_number": page_num + 1,
-                "total_pages": len(reader.pages),
+                "page_number": page_num,
+                "total_pages": total_pages,
+                "document_id": document_id,
             }
-
-            chunks = self.text_splitter.split_text(page_text)
-            for i, chunk in enumerate(chunks):
-                all_chunks.append(
-                    DocumentChunk(
-                        id=f"{document_id}_page{page_num + 1}_chunk_{i}",
-                        content=chunk,
-                        metadata={
-                            **page_metadata,
-                            "document_id": document_id,
-                            "chunk_index": len(all_chunks),
-                        },
-                    )
-                )
-
-        # Update total_chunks in metadata
-        for chunk in all_chunks:
-            chunk.metadata["total_chunks"] = len(all_chunks)
-
-        return all_chunks
+            page_chunks = self.text_splitter.split_text(page_text)
+            batch.ids.extend(f"{document_id}_page{page_num}_chunk_{i}" for i in range(len(page_chunks)))
+            batch.contents.extend(page_chunks)
+            page_metadatas.extend([page_metadata] * len(page_chunks))
+
+        total_chunks = len(batch.ids)
+        batch.metadatas = [
+            {**page_metadata, "chunk_index": index, "total_chunks": total_chunks}
+            for index, page_metadata in enumerate(page_metadatas)
+        ]
+        return batch
 
     def process_docx(
         self,
-        docx_content: bytes,
+        docx_content: FileContent,
         document_id: str,
         metadata: Optional[Dict[str, Any]] = None,
-    ) -> List[DocumentChunk]:
+    ) -> ChunkBatch:
         """
         Process a DOCX file into chunks.
 
         Args:
-            docx_content: Raw DOCX bytes
+            docx_content: Raw DOCX bytes or a binary file object
             document_id: Unique identifier for the document
             metadata: Additional metadata to attach to chunks
 
         Returns:
-            List of DocumentChunk objects
+            ChunkBatch with the document's chunks
         """
         if DocxDocument is None:
             raise ImportError("python-docx is required for DOCX processing")
 
-        doc = DocxDocument(io.BytesIO(docx_content))
+        doc = DocxDocument(_as_stream(docx_content))
         base_metadata = metadata or {}
 
         # Extract all paragraphs
@@ -174,64 +278,76 @@ class DocumentProcessor:
         )
 
         if not full_text.strip():
-            return []
+            return ChunkBatch()
 
         return self.process_text(full_text, document_id, base_metadata)
 
     def process_json(
         self,
-        json_content: bytes,
+        json_content: FileContent,
         document_id: str,
         metadata: Optional[Dict[str, Any]] = None,
-    ) -> List[DocumentChunk]:
+    ) -> ChunkBatch:
         """
         Process a JSON file into chunks.
         Handles both arrays of objects and single objects.
         Extracts text from string fields recursively.
 
         Args:
-            json_content: Raw JSON bytes
+            json_content: Raw JSON bytes or a binary file object
             document_id: Unique identifier for the document
             metadata: Additional metadata to attach to chunks
 
         Returns:
-            List of DocumentChunk objects
+            ChunkBatch with the document's chunks
         """
-        data = json.loads(json_content.decode("utf-8"))
+        data = loads(_as_bytes(json_content))
         base_metadata = metadata or {}
 
-        def extract_text_from_obj(obj, prefix: str = "") -> List[str]:
-            """Recursively extract text from JSON objects."""
+        def extract_text_from_obj(obj) -> List[str]:
+            """
+            Extract "path: text" lines from string fields of JSON objects.
+
+            Walks the structure depth-first with an explicit stack (children
+            pushed in reverse to keep document order) into a single list.
+            """
             texts = []
-            if isinstance(obj, dict):
-                for key, value in obj.items():
-                    new_prefix = f"{prefix}.{key}" if prefix else key
-                    if isinstance(value, str) and len(value) > 10:
-                        texts.append(f"{new_prefix}: {value}")
-                    elif isinstance(value, (dict, list)):
-                        texts.extend(extract_text_from_obj(value, new_prefix))
-            elif isinstance(obj, list):
-                for i, item in enumerate(obj):
-                    texts.extend(extract_text_from_obj(item, f"{prefix}[{i}]"))
+            stack = [(obj, "")] if isinstance(obj, (dict, list)) else []
+            while stack:
+                value, prefix = stack.pop()
+                if isinstance(value, str):
+                    texts.append(f"{prefix}: {value}")
+                elif isinstance(value, dict):
+                    for key, item in reversed(value.items()):
+                        # Only strings directly under an object key are text fields
+                        if isinstance(item, str):
+                            if len(item) > 10:
+                                stack.append((item, f"{prefix}.{key}" if prefix else key))
+                        elif isinstance(item, (dict, list)):
+                            stack.append((item, f"{prefix}.{key}" if prefix else key))
+                elif isinstance(value, list):
+                    for i in range(len(value) - 1, -1, -1):
+                        if isinstance(value[i], (dict, list)):
+                            stack.append((value[i], f"{prefix}[{i}]"))
             return texts
 
         # Handle array of items (process each as separate entry)
         if isinstance(data, list):
-            all_chunks = []
+            batch = ChunkBatch()
             for idx, item in enumerate(data):
                 item_texts = extract_text_from_obj(item)
                 if item_texts:
                     item_text = "\n".join(item_texts)
                     item_metadata = {**base_metadata, "json_index": idx}
-                    chunks = self.process_text(item_text, f"{document_id}_item{idx}", item_metadata)
-                    # Renumber chunk IDs to be unique
-                    for chunk in chunks:
-                        chunk.id = f"{document_id}_chunk_{len(all_chunks)}"
-                        all_chunks.append(chunk)
-            # Update total chunks
-            for chunk in all_chunks:
-                chunk.metadata["total_chunks"] = len(all_chunks)
-            return all_chunks
+                    item_batch = self.process_text(item_text, f"{document_id}_item{idx}", item_metadata)
+                    batch.contents.extend(item_batch.contents)
+                    batch.metadatas.extend(item_batch.metadatas)
+            # Number chunk IDs across items to keep them unique
+            total_chunks = len(batch.contents)
+            batch.ids = [f"{document_id}_chunk_{i}" for i in range(total_chunks)]
+            for chunk_metadata in batch.metadatas:
+                chunk_metadata["total_chunks"] = total_chunks
+            return batch
         else:
             # Single object
             texts = extract_text_from_obj(data)
@@ -240,22 +356,22 @@ class DocumentProcessor:
 
     def process_file(
         self,
-        content: bytes,
+        content: FileContent,
         filename: str,
         document_id: str,
         metadata: Optional[Dict[str, Any]] = None,
-    ) -> List[DocumentChunk]:
+    ) -> ChunkBatch:
         """
         Process a file based on its extension.
 
         Args:
-            content: Raw file bytes
+            content: Raw file bytes or a binary file object (e.g. UploadFile.file)
             filename: Original filename (used to determine type)
             document_id: Unique identifier for the document
             metadata: Additional metadata to attach to chunks
 
         Returns:
-            List of DocumentChunk objects
+            ChunkBatch with the document's chunks
         """
         file_metadata = {**(metadata or {}), "filename": filename}
         extension = filename.lower().split(".")[-1]
@@ -267,36 +383,36 @@ class DocumentProcessor:
         elif extension == "json":
             return self.process_json(content, document_id, file_metadata)
         elif extension in ["txt", "md", "markdown"]:
-            text = content.decode("utf-8")
+            text = _as_bytes(content).decode("utf-8")
             return self.process_text(text, document_id, file_metadata)
         else:
             # Try to process as plain text for unknown extensions
             try:
-                text = content.decode("utf-8")
+                text = _as_bytes(content).decode("utf-8")
                 return self.process_text(text, document_id, file_metadata)
             except UnicodeDecodeError:
                 raise ValueError(f"Unsupported file type: {extension}")
 
     def to_vector_documents(
         self,
-        chunks: List[DocumentChunk],
+        chunks: ChunkBatch,
     ) -> List[Dict[str, Any]]:
         """
-        Convert DocumentChunks to the format expected by VectorStoreService.
+        Convert a ChunkBatch to the format expected by VectorStoreService.
 
         Args:
-            chunks: List of DocumentChunk objects
+            chunks: The document's chunks
 
         Returns:
             List of dicts ready for vector store upsert
         """
         return [
             {
-                "id": chunk.id,
-                "content": chunk.content,
-                "metadata": chunk.metadata,
+                "id": chunk_id,
+                "content": content,
+                "metadata": metadata,
             }
-            for chunk in chunks
+            for chunk_id, content, metadata in zip(chunks.ids, chunks.contents, chunks.metadatas)
         ]
 
 
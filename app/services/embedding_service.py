@@ -1,20 +1,51 @@
 """
 Embedding service using OpenAI's text-embedding-3-small model.
 """
+import asyncio
+import os
+import msgspec
+from cachetools import LRUCache
 from openai import AsyncOpenAI
-from typing import List
+from typing import Dict, List
 from app.config import get_settings
+from app.core.hashing import hash_content
+from app.core.http_client import get_http_client
+from app.core.quant import quantize_int8, dequantize_int8
+from app.db.redis import get_redis
 
 settings = get_settings()
 
+# OpenAI accepts up to 2048 inputs per embeddings request
+MAX_INPUTS_PER_REQUEST = 2048
+# Requests in flight at once when a call spans several batches
+MAX_CONCURRENT_REQUESTS = 4
+# Rough characters per token, used to estimate request size without a tokenizer
+CHARS_PER_TOKEN = 4
+# Query embeddings kept in process memory
+QUERY_CACHE_MAXSIZE = 1024
+
+# Snapshot files map cache keys to int8-quantized embeddings. Decoding is
+# typed, so a tampered file can only fail to load, never run code.
+_snapshot_encoder = msgspec.msgpack.Encoder()
+_snapshot_decoder = msgspec.msgpack.Decoder(Dict[str, bytes])
+
 
 class EmbeddingService:
     """Service for generating text embeddings using OpenAI."""
 
     def __init__(self):
-        self.client = AsyncOpenAI(api_key=settings.openai_api_key)
+        self.client = AsyncOpenAI(
+            api_key=settings.openai_api_key,
+            http_client=get_http_client(),
+        )
         self.model = settings.embedding_model
         self.dimensions = settings.embedding_dimensions
+        # cache key -> embedding, in front of the shared Redis cache
+        self._query_cache: LRUCache = LRUCache(maxsize=QUERY_CACHE_MAXSIZE)
+        # Whether the cache changed since the last snapshot
+        self._query_cache_dirty = False
+        if settings.embedding_cache_snapshot_path:
+            self.load_query_cache_snapshot()
 
     async def embed_text(self, text: str) -> List[float]:
         """
@@ -26,36 +57,188 @@ class EmbeddingService:
         Returns:
             List of floats representing the embedding vector
         """
-        response = await self.client.embeddings.create(
-            model=self.model,
-            input=text,
-            dimensions=self.dimensions,
-        )
-        return response.data[0].embedding
+        return (await self.embed_texts([text]))[0]
+
+    def _query_cache_key(self, text: str) -> str:
+        """Redis key for a cached query embedding (model-specific)."""
+        return f"emb:{self.model}:{self.dimensions}:{hash_content(text.encode())}"
+
+    async def embed_query(self, text: str) -> List[float]:
+        """
+        Generate embedding for a search query, cached in memory and Redis.
+
+        Repeated queries skip the API call. Recent queries are served from an
+        in-process LRU; the Redis copy is shared across workers and stored
+        int8-quantized (about 4x smaller than float32), which barely affects
+        cosine similarity. Cache errors fall back to the API.
+
+        Args:
+            text: The query text
+
+        Returns:
+            List of floats representing the embedding vector
+        """
+        cache_key = self._query_cache_key(text)
+        embedding = self._query_cache.get(cache_key)
+        if embedding is not None:
+            return embedding
+
+        try:
+            redis = await get_redis()
+            cached = await redis.get(cache_key)
+            if cached:
+                embedding = dequantize_int8(cached)
+                self._query_cache[cache_key] = embedding
+                self._query_cache_dirty = True
+                return embedding
+        except Exception as e:
+            print(f"Warning: Could not read cached embedding: {e}")
+
+        embedding = await self.embed_text(text)
+        self._query_cache[cache_key] = embedding
+        self._query_cache_dirty = True
+
+        try:
+            redis = await get_redis()
+            await redis.set(
+                cache_key,
+                quantize_int8(embedding),
+                ex=settings.embedding_cache_ttl_seconds,
+            )
+        except Exception as e:
+            print(f"Warning: Could not cache embedding: {e}")
+        return embedding
+
+    def load_query_cache_snapshot(self) -> int:
+        """
+        Warm the in-process query cache from the snapshot file.
+
+        Returns:
+            Number of embeddings loaded
+        """
+        path = settings.embedding_cache_snapshot_path
+        try:
+            with open(path, "rb") as f:
+                snapshot = _snapshot_decoder.decode(f.read())
+        except FileNotFoundError:
+            return 0
+        except Exception as e:
+            print(f"Warning: Could not load query embedding snapshot: {e}")
+            return 0
+
+        for cache_key, data in snapshot.items():
+            self._query_cache[cache_key] = dequantize_int8(data)
+        return len(snapshot)
+
+    async def save_query_cache_snapshot(self) -> None:
+        """Write the in-process query cache to the snapshot file if it changed."""
+        if not self._query_cache_dirty:
+            return
+        # Copy on the event loop, where the cache is modified; write in a thread
+        snapshot = {
+            cache_key: quantize_int8(embedding)
+            for cache_key, embedding in self._query_cache.items()
+        }
+        self._query_cache_dirty = False
+        await asyncio.to_thread(_write_snapshot, settings.embedding_cache_snapshot_path, snapshot)
+
+    async def snapshot_query_cache_loop(self) -> None:
+        """Periodically save the query cache snapshot (runs until cancelled)."""
+        while True:
+            await asyncio.sleep(settings.embedding_cache_snapshot_interval_seconds)
+            try:
+                await self.save_query_cache_snapshot()
+            except Exception as e:
+                print(f"Warning: Could not save query embedding snapshot: {e}")
 
     async def embed_texts(self, texts: List[str]) -> List[List[float]]:
         """
-        Generate embeddings for multiple texts in a single API call.
+        Generate embeddings for multiple texts.
+
+        Duplicate texts are embedded once. Unique texts are sorted by length
+        and packed into batches of up to 2048 inputs and an estimated token
+        budget per API call, so each request holds similarly sized inputs.
+        A few batches are in flight at once for large inputs.
 
         Args:
             texts: List of texts to embed
 
         Returns:
-            List of embedding vectors
+            List of embedding vectors, in the same order as texts
         """
         if not texts:
             return []
 
-        # OpenAI supports batching up to 2048 inputs
+        # Boilerplate chunks often repeat across documents
+        unique_texts = sorted(dict.fromkeys(texts), key=len)
+        batches = self._pack_batches(unique_texts)
+
+        if len(batches) == 1:
+            sorted_embeddings = await self._embed_batch(batches[0])
+        else:
+            semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+
+            async def embed_with_limit(batch: List[str]) -> List[List[float]]:
+                async with semaphore:
+                    return await self._embed_batch(batch)
+
+            results = await asyncio.gather(*(embed_with_limit(b) for b in batches))
+            sorted_embeddings = [embedding for batch in results for embedding in batch]
+
+        # Restore the caller's order, repeating shared embeddings
+        by_text = dict(zip(unique_texts, sorted_embeddings))
+        return [by_text[text] for text in texts]
+
+    def _pack_batches(self, texts: List[str]) -> List[List[str]]:
+        """Greedily split texts into batches within the per-request limits."""
+        token_budget = settings.embedding_max_tokens_per_request
+        batches = []
+        batch: List[str] = []
+        batch_tokens = 0
+
+        for text in texts:
+            tokens = len(text) // CHARS_PER_TOKEN + 1
+            if batch and (
+                len(batch) >= MAX_INPUTS_PER_REQUEST
+                or batch_tokens + tokens > token_budget
+            ):
+                batches.append(batch)
+                batch = []
+                batch_tokens = 0
+            batch.append(text)
+            batch_tokens += tokens
+
+        batches.append(batch)
+        return batches
+
+    async def _embed_batch(self, texts: List[str]) -> List[List[float]]:
+        """Embed up to MAX_INPUTS_PER_REQUEST texts in a single API call."""
         response = await self.client.embeddings.create(
             model=self.model,
             input=texts,
             dimensions=self.dimensions,
         )
 
-        # Sort by index to maintain order
-        sorted_data = sorted(response.data, key=lambda x: x.index)
-        return [item.embedding for item in sorted_data]
+        # The API returns inputs in order; place by index only if it didn't
+        data = response.data
+        if all(item.index == i for i, item in enumerate(data)):
+            return [item.embedding for item in data]
+
+        embeddings = [None] * len(data)
+        for item in data:
+            embeddings[item.index] = item.embedding
+        return embeddings
+
+
+def _write_snapshot(path: str, snapshot: Dict[str, bytes]) -> None:
+    """Atomically replace the snapshot file, so readers never see a partial write."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_snapshot_encoder.encode(snapshot))
+    os.replace(tmp_path, path)
 
 
 # Singleton instance
@@ -1,26 +1,36 @@
 """
 LLM service using Claude API - generic for any use case.
 """
-import json
+import re
 from anthropic import AsyncAnthropic
-from typing import Any, Optional
+from typing import Any, AsyncIterator, Awaitable, Callable, Optional
 
 from app.config import get_settings
+from app.core.http_client import get_http_client
+from app.core.json import dumps, loads, JSONDecodeError
 from app.core.prompts import SYSTEM_PROMPT, USER_PROMPT_TEMPLATE, format_rag_context
 
 settings = get_settings()
 
+# Markdown code block tagged as json: ```json ... ```
+_JSON_FENCE_RE = re.compile(r"```json(.*?)```", re.DOTALL)
+# Any markdown code block
+_CODE_FENCE_RE = re.compile(r"```(.*?)```", re.DOTALL)
+
 
 class LLMService:
     """Service for interacting with Claude API."""
 
     def __init__(self):
-        self.client = AsyncAnthropic(api_key=settings.anthropic_api_key)
+        self.client = AsyncAnthropic(
+            api_key=settings.anthropic_api_key,
+            http_client=get_http_client(),
+        )
         self.model = settings.llm_model
         self.temperature = settings.llm_temperature
         self.max_tokens = settings.max_output_tokens
 
-    async def query(
+    def _build_request(
         self,
         message: Any,
         rag_chunks: list,
@@ -28,29 +38,19 @@ class LLMService:
         system_prompt: Optional[str] = None,
         model: Optional[str] = None,
         temperature: Optional[float] = None,
+        user_message: Optional[str] = None,
     ) -> dict:
-        """
-        Process a query using Claude with RAG context.
-
-        Args:
-            message: The user's message (string or structured data)
-            rag_chunks: Retrieved context chunks from knowledge base
-            instructions: Additional instructions for this query
-            system_prompt: Custom system prompt (from assistant)
-            model: Model override
-            temperature: Temperature override
-
-        Returns:
-            Dict with response and metadata
-        """
+        """Build the Claude messages API arguments for a query."""
         # Format RAG context
         rag_context = format_rag_context(rag_chunks)
 
-        # Convert message to string if it's structured data
-        if isinstance(message, dict) or isinstance(message, list):
-            user_message = json.dumps(message, indent=2, ensure_ascii=False)
-        else:
-            user_message = str(message)
+        # Convert message to string if it's structured data (unless the
+        # caller already serialized it)
+        if user_message is None:
+            if isinstance(message, dict) or isinstance(message, list):
+                user_message = dumps(message, indent=True).decode("utf-8")
+            else:
+                user_message = str(message)
 
         # Build the user prompt
         user_prompt = USER_PROMPT_TEMPLATE.format(
@@ -66,17 +66,18 @@ class LLMService:
         use_model = model or self.model
         use_temperature = temperature if temperature is not None else self.temperature
 
-        # Call Claude API
-        response = await self.client.messages.create(
-            model=use_model,
-            max_tokens=self.max_tokens,
-            temperature=use_temperature,
-            system=final_system_prompt,
-            messages=[
+        return {
+            "model": use_model,
+            "max_tokens": self.max_tokens,
+            "temperature": use_temperature,
+            "system": final_system_prompt,
+            "messages": [
                 {"role": "user", "content": user_prompt}
             ],
-        )
+        }
 
+    def _build_result(self, response: Any, model: str) -> dict:
+        """Build the query result from a complete Claude message."""
         # Extract the response text
         response_text = response.content[0].text
 
@@ -87,37 +88,108 @@ class LLMService:
             "response": parsed_response,
             "raw_response": response_text,
             "tokens_used": response.usage.input_tokens + response.usage.output_tokens,
-            "model_used": use_model,
+            "model_used": model,
         }
 
+    async def query(
+        self,
+        message: Any,
+        rag_chunks: list,
+        instructions: Optional[str] = None,
+        system_prompt: Optional[str] = None,
+        model: Optional[str] = None,
+        temperature: Optional[float] = None,
+        user_message: Optional[str] = None,
+    ) -> dict:
+        """
+        Process a query using Claude with RAG context.
+
+        Args:
+            message: The user's message (string or structured data)
+            rag_chunks: Retrieved context chunks from knowledge base
+            instructions: Additional instructions for this query
+            system_prompt: Custom system prompt (from assistant)
+            model: Model override
+            temperature: Temperature override
+            user_message: Pre-serialized message, used instead of formatting
+                message again
+
+        Returns:
+            Dict with response and metadata
+        """
+        request = self._build_request(
+            message, rag_chunks, instructions, system_prompt, model, temperature,
+            user_message,
+        )
+
+        # Call Claude API
+        response = await self.client.messages.create(**request)
+
+        return self._build_result(response, request["model"])
+
+    async def stream_query(
+        self,
+        message: Any,
+        rag_chunks: list,
+        instructions: Optional[str] = None,
+        system_prompt: Optional[str] = None,
+        model: Optional[str] = None,
+        temperature: Optional[float] = None,
+        user_message: Optional[str] = None,
+        on_complete: Optional[Callable[[dict], Awaitable[None]]] = None,
+    ) -> AsyncIterator[str]:
+        """
+        Process a query using Claude, yielding the response text as it's generated.
+
+        Args:
+            message: The user's message (string or structured data)
+            rag_chunks: Retrieved context chunks from knowledge base
+            instructions: Additional instructions for this query
+            system_prompt: Custom system prompt (from assistant)
+            model: Model override
+            temperature: Temperature override
+            user_message: Pre-serialized message, used instead of formatting
+                message again
+            on_complete: Awaited with the same dict query() returns once
+                the full message has been received
+
+        Yields:
+            Pieces of the response text
+        """
+        request = self._build_request(
+            message, rag_chunks, instructions, system_prompt, model, temperature,
+            user_message,
+        )
+
+        async with self.client.messages.stream(**request) as stream:
+            async for text in stream.text_stream:
+                yield text
+            response = await stream.get_final_message()
+
+        if on_complete is not None:
+            await on_complete(self._build_result(response, request["model"]))
+
     def _try_parse_json(self, text: str) -> Any:
         """Try to parse text as JSON, return original if not valid JSON."""
         text = text.strip()
 
-        # Try direct parse
-        try:
-            return json.loads(text)
-        except json.JSONDecodeError:
-            pass
-
-        # Try to extract from markdown code blocks
-        if "```json" in text:
+        # Try direct parse (only objects/arrays are treated as JSON responses)
+        if text[:1] in ("{", "["):
             try:
-                json_start = text.find("```json") + 7
-                json_end = text.find("```", json_start)
-                json_str = text[json_start:json_end].strip()
-                return json.loads(json_str)
-            except (json.JSONDecodeError, ValueError):
+                return loads(text)
+            except JSONDecodeError:
                 pass
 
-        if "```" in text:
-            try:
-                json_start = text.find("```") + 3
-                json_end = text.find("```", json_start)
-                json_str = text[json_start:json_end].strip()
-                return json.loads(json_str)
-            except (json.JSONDecodeError, ValueError):
-                pass
+        # Try to extract from a markdown code block: the first one tagged
+        # json, else the first one of any kind (replies may show an example
+        # snippet before the actual JSON)
+        for fence_re in (_JSON_FENCE_RE, _CODE_FENCE_RE):
+            match = fence_re.search(text)
+            if match:
+                try:
+                    return loads(match.group(1).strip())
+                except JSONDecodeError:
+                    pass
 
         # Return as string if not JSON
         return text
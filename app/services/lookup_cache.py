@@ -0,0 +1,130 @@
+"""
+In-process cache for tenant authentication and assistant lookups.
+Both are read-heavy and change rarely, so they are kept in short-lived
+TTL caches and invalidated across workers via Redis pub/sub.
+"""
+import asyncio
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from uuid import UUID
+
+from cachetools import TTLCache
+
+from app.db.redis import get_redis
+from app.models.tenant import Tenant, Assistant
+from app.config import get_settings
+
+settings = get_settings()
+
+# Channels are "tenant:{tenant_id}:{scope}" where scope is "auth" or "assistants"
+CHANNEL_PATTERN = "tenant:*"
+SCOPE_AUTH = "auth"
+SCOPE_ASSISTANTS = "assistants"
+
+
+class LookupCacheService:
+    """
+    Caches API key -> tenant and tenant -> assistants lookups.
+
+    Entries expire after a short TTL, so a worker that misses an
+    invalidation message serves stale data for at most that long.
+    """
+
+    def __init__(self):
+        ttl = settings.lookup_cache_ttl_seconds
+        # key_hash -> (tenant, api key expires_at)
+        self._tenants: TTLCache = TTLCache(maxsize=10_000, ttl=ttl)
+        # tenant_id -> {"id": {assistant_id: assistant}, "slug": {slug: assistant}}
+        self._assistants: TTLCache = TTLCache(maxsize=10_000, ttl=ttl)
+
+    def get_tenant(self, key_hash: str) -> Optional[Tuple[Tenant, Optional[datetime]]]:
+        """Get the cached tenant and key expiry for an API key hash."""
+        return self._tenants.get(key_hash)
+
+    def set_tenant(
+        self,
+        key_hash: str,
+        tenant: Tenant,
+        expires_at: Optional[datetime],
+    ) -> None:
+        """Cache a successfully authenticated API key."""
+        self._tenants[key_hash] = (tenant, expires_at)
+
+    def get_assistants(self, tenant_id: UUID) -> Optional[Dict[str, Dict]]:
+        """Get the cached map of active assistants for a tenant."""
+        return self._assistants.get(tenant_id)
+
+    def set_assistants(
+        self,
+        tenant_id: UUID,
+        assistants: List[Assistant],
+    ) -> Dict[str, Dict]:
+        """Build and cache the map of active assistants for a tenant."""
+        assistant_map = {
+            "id": {a.id: a for a in assistants},
+            "slug": {a.slug: a for a in assistants},
+        }
+        self._assistants[tenant_id] = assistant_map
+        return assistant_map
+
+    def invalidate(self, tenant_id: UUID | str, scope: str) -> None:
+        """Drop cached entries for a tenant in this process."""
+        tenant_id = UUID(str(tenant_id))
+        if scope == SCOPE_ASSISTANTS:
+            self._assistants.pop(tenant_id, None)
+        elif scope == SCOPE_AUTH:
+            stale = [
+                key_hash
+                for key_hash, (tenant, _) in list(self._tenants.items())
+                if tenant.id == tenant_id
+            ]
+            for key_hash in stale:
+                self._tenants.pop(key_hash, None)
+
+    async def publish_invalidation(self, tenant_id: UUID | str, scope: str) -> None:
+        """
+        Invalidate cached entries for a tenant in every worker.
+
+        The local cache is cleared immediately; other workers are notified
+        through Redis. Publishing failures are ignored since entries
+        expire on their own.
+        """
+        self.invalidate(tenant_id, scope)
+        try:
+            redis = await get_redis()
+            await redis.publish(f"tenant:{tenant_id}:{scope}", "1")
+        except Exception as e:
+            print(f"Warning: Could not publish cache invalidation: {e}")
+
+    async def listen_for_invalidations(self) -> None:
+        """Subscribe to invalidation events and apply them (runs until cancelled)."""
+        while True:
+            try:
+                redis = await get_redis()
+                pubsub = redis.pubsub()
+                await pubsub.psubscribe(CHANNEL_PATTERN)
+                try:
+                    async for message in pubsub.listen():
+                        if message["type"] != "pmessage":
+                            continue
+                        _, tenant_id, scope = message["channel"].decode().split(":", 2)
+                        self.invalidate(tenant_id, scope)
+                finally:
+                    await pubsub.reset()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Warning: Cache invalidation listener failed: {e}")
+                await asyncio.sleep(1)
+
+
+# Singleton instance
+_lookup_cache: LookupCacheService | None = None
+
+
+def get_lookup_cache() -> LookupCacheService:
+    """Get the singleton lookup cache instance."""
+    global _lookup_cache
+    if _lookup_cache is None:
+        _lookup_cache = LookupCacheService()
+    return _lookup_cache
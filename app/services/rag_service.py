@@ -2,18 +2,34 @@
 RAG (Retrieval Augmented Generation) service.
 Generic service that works with any type of query - not specific to evaluations.
 """
+import asyncio
 import time
-import json
-import hashlib
 from uuid import uuid4
-from typing import Any, Optional
+from typing import Any, AsyncIterator, Optional
 
+from app.core.hashing import hash_content
+from app.core.json import dumps
 from app.models.tenant import Tenant, Assistant
 from app.services.vector_store import get_vector_store
 from app.services.llm_service import get_llm_service
 from app.services.cache_service import get_cache_service
 
 
+# Background cache writes (referenced here so they aren't garbage collected)
+_pending_cache_writes: set[asyncio.Task] = set()
+
+
+def _on_cache_write_done(task: asyncio.Task) -> None:
+    """Forget a finished cache write and report its failure, if any."""
+    _pending_cache_writes.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        print(f"Warning: Could not cache query result: {task.exception()}")
+
+
+# Fields of structured messages that hold searchable text, in priority order
+_SEARCH_TEXT_KEYS = ("query", "question", "text", "content", "message", "search")
+
+
 class RAGService:
     """
     Main RAG service that orchestrates:
@@ -28,41 +44,36 @@ class RAGService:
         self.llm_service = get_llm_service()
         self.cache_service = get_cache_service()
 
-    async def query(
-        self,
-        tenant: Tenant,
-        message: Any,
-        instructions: Optional[str] = None,
-        search_query: Optional[str] = None,
-        top_k: int = 5,
-        assistant: Optional[Assistant] = None,
-    ) -> dict:
+    def _serialize_message(self, message: Any) -> bytes:
         """
-        Process a query with RAG.
-
-        Args:
-            tenant: The tenant making the request
-            message: The message/query (string or structured data)
-            instructions: Additional instructions for the LLM
-            search_query: Custom query for knowledge base search
-            top_k: Number of chunks to retrieve
-            assistant: The assistant to use (optional)
+        Serialize a message once for both the cache key and the LLM prompt.
 
-        Returns:
-            Query result with response and metadata
+        Structured messages are encoded with sorted keys (stable hashes)
+        and indented (readable in the prompt).
         """
-        start_time = time.time()
-        query_id = str(uuid4())
-
-        # Build cache key
-        message_str = json.dumps(message, sort_keys=True) if isinstance(message, (dict, list)) else str(message)
+        # Plain text is the common case: encode it directly
+        if isinstance(message, str):
+            return message.encode()
+        if isinstance(message, (dict, list)):
+            return dumps(message, sort_keys=True, indent=True)
+        return str(message).encode()
+
+    def _cache_key(self, message_bytes: bytes, assistant: Optional[Assistant]) -> tuple[str, str]:
+        """Get the (content_hash, cache_key_suffix) for a serialized message."""
         assistant_id = str(assistant.id) if assistant else "default"
-        cache_suffix = f":{assistant_id}"
 
         # Create cache key from message hash
-        content_hash = hashlib.sha256(message_str.encode()).hexdigest()[:32]
+        return hash_content(message_bytes), f":{assistant_id}"
 
-        # Check cache
+    async def _get_cached(
+        self,
+        tenant: Tenant,
+        content_hash: str,
+        cache_suffix: str,
+        query_id: str,
+        start_time: float,
+    ) -> Optional[dict]:
+        """Get a cached result, stamped for this request."""
         cached = await self.cache_service.get_cached_result(
             tenant_id=str(tenant.id),
             content_hash=content_hash,
@@ -73,8 +84,24 @@ class RAGService:
             cached["cached"] = True
             cached["query_id"] = query_id
             cached["processing_time_ms"] = int((time.time() - start_time) * 1000)
-            return cached
+        return cached
+
+    async def _prepare_llm_query(
+        self,
+        tenant: Tenant,
+        message: Any,
+        message_bytes: bytes,
+        instructions: Optional[str],
+        search_query: Optional[str],
+        top_k: int,
+        assistant: Optional[Assistant],
+    ) -> tuple[list, dict]:
+        """
+        Retrieve context and build the LLM call arguments for a query.
 
+        Returns:
+            Tuple of (rag_chunks, kwargs for LLMService.query/stream_query)
+        """
         # Determine search query for knowledge base
         if search_query:
             kb_query = search_query
@@ -103,17 +130,28 @@ class RAGService:
             else:
                 final_instructions = assistant.evaluation_prompt
 
-        # Call LLM
-        llm_result = await self.llm_service.query(
-            message=message,
-            rag_chunks=rag_chunks,
-            instructions=final_instructions,
-            system_prompt=system_prompt,
-            model=assistant.model if assistant else None,
-            temperature=assistant.temperature if assistant else None,
-        )
+        return rag_chunks, {
+            "message": message,
+            "user_message": message_bytes.decode("utf-8"),
+            "rag_chunks": rag_chunks,
+            "instructions": final_instructions,
+            "system_prompt": system_prompt,
+            "model": assistant.model if assistant else None,
+            "temperature": assistant.temperature if assistant else None,
+        }
 
-        # Build result
+    async def _finish_query(
+        self,
+        tenant: Tenant,
+        assistant: Optional[Assistant],
+        query_id: str,
+        llm_result: dict,
+        rag_chunks: list,
+        content_hash: str,
+        cache_suffix: str,
+        start_time: float,
+    ) -> dict:
+        """Build the query result from the LLM output and cache it."""
         result = {
             "query_id": query_id,
             "tenant_id": str(tenant.id),
@@ -126,16 +164,117 @@ class RAGService:
             "processing_time_ms": int((time.time() - start_time) * 1000),
         }
 
-        # Cache result
-        await self.cache_service.cache_result(
-            tenant_id=str(tenant.id),
-            content_hash=content_hash,
-            result=result,
-            cache_key_suffix=cache_suffix,
+        # Cache result in the background; the response doesn't wait on Redis
+        task = asyncio.create_task(
+            self.cache_service.cache_result(
+                tenant_id=str(tenant.id),
+                content_hash=content_hash,
+                # Copy: the caller may modify result before the write runs
+                result=dict(result),
+                cache_key_suffix=cache_suffix,
+            )
         )
+        _pending_cache_writes.add(task)
+        task.add_done_callback(_on_cache_write_done)
 
         return result
 
+    async def query(
+        self,
+        tenant: Tenant,
+        message: Any,
+        instructions: Optional[str] = None,
+        search_query: Optional[str] = None,
+        top_k: int = 5,
+        assistant: Optional[Assistant] = None,
+    ) -> dict:
+        """
+        Process a query with RAG.
+
+        Args:
+            tenant: The tenant making the request
+            message: The message/query (string or structured data)
+            instructions: Additional instructions for the LLM
+            search_query: Custom query for knowledge base search
+            top_k: Number of chunks to retrieve
+            assistant: The assistant to use (optional)
+
+        Returns:
+            Query result with response and metadata
+        """
+        start_time = time.time()
+        query_id = str(uuid4())
+
+        message_bytes = self._serialize_message(message)
+        content_hash, cache_suffix = self._cache_key(message_bytes, assistant)
+
+        # Check cache
+        cached = await self._get_cached(tenant, content_hash, cache_suffix, query_id, start_time)
+        if cached:
+            return cached
+
+        rag_chunks, llm_kwargs = await self._prepare_llm_query(
+            tenant, message, message_bytes, instructions, search_query, top_k, assistant
+        )
+
+        # Call LLM
+        llm_result = await self.llm_service.query(**llm_kwargs)
+
+        return await self._finish_query(
+            tenant, assistant, query_id, llm_result, rag_chunks,
+            content_hash, cache_suffix, start_time,
+        )
+
+    async def stream_query(
+        self,
+        tenant: Tenant,
+        message: Any,
+        instructions: Optional[str] = None,
+        search_query: Optional[str] = None,
+        top_k: int = 5,
+        assistant: Optional[Assistant] = None,
+    ) -> AsyncIterator[dict]:
+        """
+        Process a query with RAG, streaming the LLM output as it's generated.
+
+        Takes the same arguments as query(). The result is cached once the
+        stream completes.
+
+        Yields:
+            {"type": "delta", "text": ...} for each piece of generated text,
+            then {"type": "done", "result": ...} with the dict query() would
+            return (the only event on a cache hit)
+        """
+        start_time = time.time()
+        query_id = str(uuid4())
+
+        message_bytes = self._serialize_message(message)
+        content_hash, cache_suffix = self._cache_key(message_bytes, assistant)
+
+        # Check cache
+        cached = await self._get_cached(tenant, content_hash, cache_suffix, query_id, start_time)
+        if cached:
+            yield {"type": "done", "result": cached}
+            return
+
+        rag_chunks, llm_kwargs = await self._prepare_llm_query(
+            tenant, message, message_bytes, instructions, search_query, top_k, assistant
+        )
+
+        result = None
+
+        async def on_complete(llm_result: dict) -> None:
+            nonlocal result
+            result = await self._finish_query(
+                tenant, assistant, query_id, llm_result, rag_chunks,
+                content_hash, cache_suffix, start_time,
+            )
+
+        async for text in self.llm_service.stream_query(**llm_kwargs, on_complete=on_complete):
+            yield {"type": "delta", "text": text}
+
+        yield {"type": "done", "result": result}
+
     def _extract_search_text(self, data: Any, max_length: int = 500) -> str:
         """Extract text from structured data for knowledge base search."""
         if isinstance(data, str):
@@ -145,13 +284,12 @@ class RAGService:
 
         if isinstance(data, dict):
             # Look for common text fields
-            for key in ["query", "question", "text", "content", "message", "search"]:
-                if key in data and isinstance(data[key], str):
-                    text_parts.append(data[key])
+            text_parts = [data[key] for key in _SEARCH_TEXT_KEYS if isinstance(data.get(key), str)]
 
             # Also check nested structures like questions array
-            if "questions" in data and isinstance(data["questions"], list):
-                for q in data["questions"][:3]:  # First 3 questions
+            questions = data.get("questions")
+            if isinstance(questions, list):
+                for q in questions[:3]:  # First 3 questions
                     if isinstance(q, dict):
                         if "question" in q:
                             text_parts.append(q["question"])
@@ -1,15 +1,129 @@
 """
 Vector store service using Pinecone with namespace isolation per tenant.
 """
+import asyncio
+import random
+import threading
+import time
+import numpy as np
 from pinecone import Pinecone, ServerlessSpec
-from typing import List, Dict, Any, Optional
+from pinecone.config.openapi import OpenApiConfigFactory
+from pinecone.core.client.configuration import Configuration as OpenApiConfiguration
+from pinecone.data import Index
+from tenacity import (
+    RetryCallState,
+    retry,
+    retry_if_exception,
+    stop_after_attempt,
+    wait_random_exponential,
+)
+from typing import List, Dict, Any, Optional, Tuple
 from dataclasses import dataclass
+from urllib3.exceptions import HTTPError as Urllib3HTTPError
+
+try:
+    from pinecone.grpc import PineconeGRPC  # Requires pinecone-client[grpc]
+except ImportError:
+    PineconeGRPC = None
 
 from app.config import get_settings
+from app.core.hashing import hash_content
+from app.core.json import dumps
+from app.core.quant import quantize_int8_rows
 from app.services.embedding_service import get_embedding_service
 
 settings = get_settings()
 
+# Ids per fetch request (sent in the query string, so kept small)
+FETCH_BATCH_SIZE = 100
+# Random delay before each upsert, so batches don't hit Pinecone in lockstep
+UPSERT_MAX_JITTER_SECONDS = 0.05
+# Attempts per upsert batch before giving up
+UPSERT_MAX_ATTEMPTS = 6
+# Longest wait between upsert attempts
+UPSERT_MAX_RETRY_WAIT_SECONDS = 30.0
+# REST status codes and gRPC status names worth retrying
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+RETRYABLE_GRPC_CODES = {"RESOURCE_EXHAUSTED", "UNAVAILABLE", "DEADLINE_EXCEEDED", "INTERNAL"}
+# Pinecone rejects vectors whose metadata exceeds 40 KB
+PINECONE_METADATA_MAX_BYTES = 40 * 1024
+# How long an index stats snapshot is reused across tenants
+INDEX_STATS_TTL_SECONDS = 10.0
+
+# (id, values, metadata), as accepted by Index.upsert
+VectorTuple = Tuple[str, List[float], Dict[str, Any]]
+
+
+def _classify_error(exc: BaseException) -> Optional[bool]:
+    """Whether a single exception is retryable, or None if it doesn't say."""
+    # REST client: PineconeApiException carries the HTTP status
+    status = getattr(exc, "status", None)
+    if isinstance(status, int):
+        return status in RETRYABLE_STATUS_CODES
+    # gRPC: grpc.RpcError exposes code()
+    code = getattr(exc, "code", None)
+    if callable(code):
+        try:
+            return getattr(code(), "name", None) in RETRYABLE_GRPC_CODES
+        except Exception:
+            return None
+    if isinstance(exc, (Urllib3HTTPError, ConnectionError, TimeoutError)):
+        return True
+    return None
+
+
+def _is_retryable(exc: BaseException) -> bool:
+    """
+    Whether an upsert error is a rate limit, server error or network failure.
+
+    The gRPC client raises a PineconeException that wraps the grpc error as
+    its cause, so the exception chain is searched for the first error that
+    carries a status.
+    """
+    seen = set()
+    current: Optional[BaseException] = exc
+    while current is not None and id(current) not in seen:
+        seen.add(id(current))
+        retryable = _classify_error(current)
+        if retryable is not None:
+            return retryable
+        current = current.__cause__ or current.__context__
+    return False
+
+
+_backoff = wait_random_exponential(multiplier=0.5, max=UPSERT_MAX_RETRY_WAIT_SECONDS)
+
+
+def _wait_for_retry(retry_state: RetryCallState) -> float:
+    """Honor a Retry-After header when Pinecone sends one, else back off with jitter."""
+    exc = retry_state.outcome.exception()
+    headers = getattr(exc, "headers", None) or {}
+    try:
+        retry_after = float(headers.get("Retry-After"))
+    except (TypeError, ValueError):
+        return _backoff(retry_state)
+    return min(retry_after, UPSERT_MAX_RETRY_WAIT_SECONDS)
+
+
+def utf8_truncate(text: str, max_bytes: int) -> str:
+    """
+    Truncate text to at most max_bytes of UTF-8 without splitting a character.
+
+    Args:
+        text: The text to truncate
+        max_bytes: Maximum encoded length
+
+    Returns:
+        The longest prefix of text that fits
+    """
+    # A character is at most 4 bytes, so short text needs no encoding
+    if len(text) * 4 <= max_bytes:
+        return text
+    encoded = text.encode("utf-8")
+    if len(encoded) <= max_bytes:
+        return text
+    return encoded[:max_bytes].decode("utf-8", "ignore")
+
 
 @dataclass
 class SearchResult:
@@ -27,30 +141,92 @@ class VectorStoreService:
 
     Each tenant's data is stored in a separate namespace within the same index.
     This provides logical isolation while sharing infrastructure.
+
+    One Index client is shared per process and is safe to call from worker
+    threads. Data calls go over gRPC (one multiplexed HTTP/2 channel,
+    protobuf payloads) when the grpc extra is installed; otherwise over
+    REST with a connection pool sized to pinecone_pool_threads so
+    concurrent requests reuse warm connections.
     """
 
     def __init__(self):
-        self.pc = Pinecone(api_key=settings.pinecone_api_key)
+        self._use_grpc = settings.pinecone_use_grpc and PineconeGRPC is not None
+        # Only shrinks JSON payloads; over gRPC it would just lose precision
+        self._quantize_vectors = settings.pinecone_quantize_vectors and not self._use_grpc
+        if self._use_grpc:
+            self.pc = PineconeGRPC(api_key=settings.pinecone_api_key)
+            if settings.pinecone_quantize_vectors:
+                print(
+                    "Warning: pinecone_quantize_vectors has no effect over gRPC "
+                    "(floats are fixed-width in protobuf); ignoring it"
+                )
+        else:
+            self.pc = Pinecone(
+                api_key=settings.pinecone_api_key,
+                pool_threads=settings.pinecone_pool_threads,
+            )
         self.index_name = settings.pinecone_index_name
         self._index = None
+        self._index_lock = threading.Lock()
         self._embedding_service = get_embedding_service()
+        # (monotonic time fetched, describe_index_stats response)
+        self._stats_cache: tuple[float, Any] | None = None
+        # Shared by every upsert and fetch, so concurrent callers together
+        # stay within pinecone_max_in_flight requests
+        self._requests_in_flight = asyncio.Semaphore(settings.pinecone_max_in_flight)
 
     @property
     def index(self):
         """Lazy load the Pinecone index."""
         if self._index is None:
-            # Create index if it doesn't exist
-            if self.index_name not in self.pc.list_indexes().names():
-                self.pc.create_index(
-                    name=self.index_name,
-                    dimension=settings.embedding_dimensions,
-                    metric="cosine",
-                    spec=ServerlessSpec(
-                        cloud="aws",
-                        region=settings.pinecone_environment,
-                    ),
-                )
-            self._index = self.pc.Index(self.index_name)
+            # Resolved from worker threads, so only one may create the client
+            with self._index_lock:
+                if self._index is None:
+                    self._index = self._create_index()
+        return self._index
+
+    def _create_index(self):
+        """Create the index if it doesn't exist and return a client for it."""
+        if self.index_name not in self.pc.list_indexes().names():
+            self.pc.create_index(
+                name=self.index_name,
+                dimension=settings.embedding_dimensions,
+                metric="cosine",
+                spec=ServerlessSpec(
+                    cloud="aws",
+                    region=settings.pinecone_environment,
+                ),
+            )
+        if self._use_grpc:
+            return self.pc.Index(self.index_name)
+
+        # Pinecone.Index() builds its own default config, so the data-plane
+        # client is built directly to size its connection pool
+        host = self.pc.describe_index(self.index_name).host
+        if not host.startswith(("http://", "https://")):
+            host = f"https://{host}"
+        return Index(
+            api_key=settings.pinecone_api_key,
+            host=host,
+            pool_threads=settings.pinecone_pool_threads,
+            openapi_config=self._data_plane_config(host),
+        )
+
+    def _data_plane_config(self, host: str) -> OpenApiConfiguration:
+        """Client config for the index host, with a pool of kept-alive connections."""
+        openapi_config = OpenApiConfigFactory.build(
+            api_key=settings.pinecone_api_key,
+            host=host,
+        )
+        # urllib3 keeps this many connections alive per host
+        openapi_config.connection_pool_maxsize = settings.pinecone_pool_threads
+        return openapi_config
+
+    async def _get_index(self):
+        """Get the index, resolving it off the event loop on first use."""
+        if self._index is None:
+            # May list or create the index over the network
+            await asyncio.to_thread(getattr, self, "index")
         return self._index
 
     def _get_namespace(self, tenant_slug: str) -> str:
@@ -65,44 +241,188 @@ class VectorStoreService:
         """
         Upsert documents to the tenant's namespace.
 
+        Documents are embedded and upserted pinecone_doc_chunk_size at a
+        time, which bounds how many embeddings are held in memory at once.
+
+        Args:
+            tenant_slug: The tenant's slug (used as namespace)
+            documents: List of dicts with 'id', 'content', and optional 'metadata'
+
+        Returns:
+            Number of vectors upserted
+        """
+        doc_chunk_size = settings.pinecone_doc_chunk_size
+        total_upserted = 0
+
+        for i in range(0, len(documents), doc_chunk_size):
+            doc_chunk = documents[i : i + doc_chunk_size]
+
+            # Extract texts for embedding
+            texts = [doc["content"] for doc in doc_chunk]
+
+            # Generate embeddings
+            embeddings = await self._embedding_service.embed_texts(texts)
+
+            total_upserted += await self.upsert_embeddings(tenant_slug, doc_chunk, embeddings)
+
+        return total_upserted
+
+    async def upsert_embeddings(
+        self,
+        tenant_slug: str,
+        documents: List[Dict[str, Any]],
+        embeddings: List[List[float]],
+    ) -> int:
+        """
+        Upsert documents whose embeddings were already generated.
+
         Args:
             tenant_slug: The tenant's slug (used as namespace)
             documents: List of dicts with 'id', 'content', and optional 'metadata'
+            embeddings: One embedding per document, in the same order
 
         Returns:
             Number of vectors upserted
         """
+        if not documents:
+            return 0
+
         namespace = self._get_namespace(tenant_slug)
 
-        # Extract texts for embedding
-        texts = [doc["content"] for doc in documents]
+        # One contiguous (N, D) float32 array instead of N lists of floats
+        matrix = np.asarray(embeddings, dtype=np.float32).reshape(len(documents), -1)
+        # Unit length, so stored vectors can be compared by dot product
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        matrix /= np.where(norms > 0, norms, 1.0)
+
+        if self._quantize_vectors:
+            # Whole-number floats serialize to far fewer JSON bytes than
+            # full-precision ones, and cosine similarity ignores the dropped
+            # scale. Kept as floats: the REST client rejects int values.
+            matrix = quantize_int8_rows(matrix).astype(np.float32)
+
+        # Pinecone takes plain lists, so convert only at the boundary.
+        # (id, values, metadata) tuples skip a dict per vector; both the
+        # REST and gRPC clients accept them. Columns are built separately
+        # and zipped, so the tuples are assembled in C.
+        build_metadata = self._build_metadata
+        ids = [doc["id"] for doc in documents]
+        metadatas = [build_metadata(doc, tenant_slug) for doc in documents]
+        vectors = list(zip(ids, matrix.tolist(), metadatas))
+
+        index = await self._get_index()
+
+        # Send batches concurrently, with a bounded number in flight to stay
+        # under Pinecone's rate limits
+        batch_size = settings.pinecone_batch_size
+        semaphore = self._requests_in_flight
+
+        async def upsert_batch(batch: List[VectorTuple]) -> int:
+            await asyncio.sleep(random.uniform(0, UPSERT_MAX_JITTER_SECONDS))
+            # Retries keep their slot, so backing off also lowers the load
+            async with semaphore:
+                return await self._upsert_batch(index, batch, namespace)
+
+        counts = await asyncio.gather(*(
+            upsert_batch(vectors[i : i + batch_size])
+            for i in range(0, len(vectors), batch_size)
+        ))
+        return sum(counts)
+
+    async def filter_unchanged(
+        self,
+        tenant_slug: str,
+        documents: List[Dict[str, Any]],
+    ) -> List[Dict[str, Any]]:
+        """
+        Drop documents that are already stored unchanged.
 
-        # Generate embeddings
-        embeddings = await self._embedding_service.embed_texts(texts)
+        Stored vectors carry a content_hash in their metadata; documents whose
+        hash matches are left out, so they aren't embedded or upserted again.
 
-        # Prepare vectors for upsert
-        vectors = []
-        for doc, embedding in zip(documents, embeddings):
-            metadata = doc.get("metadata", {})
-            metadata["content"] = doc["content"][:1000]  # Store truncated content
-            metadata["tenant_slug"] = tenant_slug  # Redundant but useful for debugging
+        Args:
+            tenant_slug: The tenant's slug
+            documents: List of dicts with 'id', 'content', and optional 'metadata'
 
-            vectors.append({
-                "id": doc["id"],
-                "values": embedding,
-                "metadata": metadata,
-            })
+        Returns:
+            The documents that are new or changed
+        """
+        if not documents:
+            return []
 
-        # Batch upsert (Pinecone recommends batches of 100)
-        batch_size = 100
-        total_upserted = 0
+        namespace = self._get_namespace(tenant_slug)
+        index = await self._get_index()
+        semaphore = self._requests_in_flight
+
+        async def fetch_hashes(ids: List[str]) -> Dict[str, Any]:
+            async with semaphore:
+                response = await asyncio.to_thread(index.fetch, ids=ids, namespace=namespace)
+            return {
+                vector_id: (getattr(vector, "metadata", None) or {}).get("content_hash")
+                for vector_id, vector in response.vectors.items()
+            }
+
+        ids = [doc["id"] for doc in documents]
+        stored_hashes = {}
+        for hashes in await asyncio.gather(*(
+            fetch_hashes(ids[i : i + FETCH_BATCH_SIZE])
+            for i in range(0, len(ids), FETCH_BATCH_SIZE)
+        )):
+            stored_hashes.update(hashes)
+
+        return [
+            doc
+            for doc in documents
+            if stored_hashes.get(doc["id"]) != self._content_hash(doc)
+        ]
+
+    @retry(
+        retry=retry_if_exception(_is_retryable),
+        wait=_wait_for_retry,
+        stop=stop_after_attempt(UPSERT_MAX_ATTEMPTS),
+        reraise=True,
+    )
+    async def _upsert_batch(
+        self,
+        index: Any,
+        batch: List[VectorTuple],
+        namespace: str,
+    ) -> int:
+        """Upsert one batch, retrying transient failures on their own."""
+        response = await asyncio.to_thread(index.upsert, vectors=batch, namespace=namespace)
+        return response.upserted_count
 
-        for i in range(0, len(vectors), batch_size):
-            batch = vectors[i : i + batch_size]
-            self.index.upsert(vectors=batch, namespace=namespace)
-            total_upserted += len(batch)
+    def _build_metadata(self, doc: Dict[str, Any], tenant_slug: str) -> Dict[str, Any]:
+        """
+        Build a vector's metadata without modifying the caller's document.
 
-        return total_upserted
+        Content is truncated to a UTF-8 byte budget and left out entirely
+        if the rest of the metadata already nears Pinecone's size limit, so
+        one oversized document can't fail its whole batch.
+        """
+        metadata = {
+            **doc.get("metadata", {}),
+            "tenant_slug": tenant_slug,  # Redundant but useful for debugging
+            "content_hash": self._content_hash(doc),  # Lets unchanged re-uploads be skipped
+        }
+        max_bytes = settings.pinecone_content_max_bytes
+
+        if len(dumps(metadata)) + max_bytes > PINECONE_METADATA_MAX_BYTES:
+            print(f"Warning: Metadata for {doc['id']} is too large, not storing content")
+        else:
+            # Store truncated content
+            metadata["content"] = utf8_truncate(doc["content"], max_bytes)
+        return metadata
+
+    def _content_hash(self, doc: Dict[str, Any]) -> str:
+        """
+        Hash a document's content and metadata, as stored with its vector.
+
+        Metadata is part of the hash so edits to it are re-upserted; callers
+        that use filter_unchanged must keep it free of machine-specific
+        values such as absolute paths.
+        """
+        return hash_content(dumps([doc["content"], doc.get("metadata", {})], sort_keys=True))
 
     async def search(
         self,
@@ -126,10 +446,12 @@ class VectorStoreService:
         namespace = self._get_namespace(tenant_slug)
 
         # Generate query embedding
-        query_embedding = await self._embedding_service.embed_text(query)
+        query_embedding = await self._embedding_service.embed_query(query)
 
-        # Search in namespace
-        results = self.index.query(
+        # Search in namespace (the SDK is blocking, so run it in a thread)
+        index = await self._get_index()
+        results = await asyncio.to_thread(
+            index.query,
             vector=query_embedding,
             top_k=top_k,
             namespace=namespace,
@@ -167,7 +489,8 @@ class VectorStoreService:
             Number of documents deleted
         """
         namespace = self._get_namespace(tenant_slug)
-        self.index.delete(ids=document_ids, namespace=namespace)
+        index = await self._get_index()
+        await asyncio.to_thread(index.delete, ids=document_ids, namespace=namespace)
         return len(document_ids)
 
     async def delete_tenant_data(self, tenant_slug: str) -> bool:
@@ -182,13 +505,17 @@ class VectorStoreService:
             True if successful
         """
         namespace = self._get_namespace(tenant_slug)
-        self.index.delete(delete_all=True, namespace=namespace)
+        index = await self._get_index()
+        await asyncio.to_thread(index.delete, delete_all=True, namespace=namespace)
         return True
 
     async def get_namespace_stats(self, tenant_slug: str) -> Dict[str, Any]:
         """
         Get statistics for a tenant's namespace.
 
+        Index stats cover every namespace, so one snapshot is shared by all
+        tenants for a few seconds instead of being fetched per request.
+
         Args:
             tenant_slug: The tenant's slug
 
@@ -196,7 +523,7 @@ class VectorStoreService:
             Dict with namespace statistics
         """
         namespace = self._get_namespace(tenant_slug)
-        stats = self.index.describe_index_stats()
+        stats = await self._get_index_stats()
 
         namespace_stats = stats.namespaces.get(namespace, {})
         return {
@@ -205,6 +532,17 @@ class VectorStoreService:
             "total_index_vectors": stats.total_vector_count,
         }
 
+    async def _get_index_stats(self) -> Any:
+        """Get index stats, reusing a recent snapshot."""
+        cached = self._stats_cache
+        if cached is not None and time.monotonic() - cached[0] < INDEX_STATS_TTL_SECONDS:
+            return cached[1]
+
+        index = await self._get_index()
+        stats = await asyncio.to_thread(index.describe_index_stats)
+        self._stats_cache = (time.monotonic(), stats)
+        return stats
+
 
 # Singleton instance
 _vector_store: VectorStoreService | None = None
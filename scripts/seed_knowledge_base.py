@@ -4,68 +4,223 @@ Script para cargar la base de conocimiento inicial en Pinecone.
 Ejecutar: python scripts/seed_knowledge_base.py --tenant-slug <slug>
 """
 import asyncio
+import logging
+import mmap
+import multiprocessing
+import os
 import sys
+from concurrent.futures import ProcessPoolExecutor
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
+from queue import SimpleQueue
+from typing import Any, Dict, List, Set
 
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+from app.core.json import dumps, loads
 from app.services.document_processor import get_document_processor
+from app.services.embedding_service import get_embedding_service
 from app.services.vector_store import get_vector_store
 
 
 KNOWLEDGE_BASE_PATH = Path(__file__).parent.parent / "knowledge_base"
 
+# Chunks per embedding request
+EMBED_BATCH_SIZE = 256
+# Embedded batches waiting for upsert before embedding pauses
+MAX_PENDING_BATCHES = 4
+# Batches being upserted at once
+UPSERT_WORKERS = 4
 
-async def seed_knowledge_base(tenant_slug: str):
-    """Load initial knowledge base documents for a tenant."""
-    print(f"Loading knowledge base for tenant: {tenant_slug}")
+logger = logging.getLogger("seed_knowledge_base")
 
-    processor = get_document_processor()
+
+def configure_logging() -> QueueListener:
+    """
+    Send log records through a queue to a background writer thread.
+
+    Logging calls only enqueue the record, so writing to stdout never
+    blocks the event loop while embeddings and upserts are in flight.
+
+    Returns:
+        The started listener; stop it to flush remaining records
+    """
+    log_queue: SimpleQueue = SimpleQueue()
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    listener = QueueListener(log_queue, handler)
+
+    logger.addHandler(QueueHandler(log_queue))
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    listener.start()
+    return listener
+
+
+def checkpoint_path(tenant_slug: str) -> Path:
+    """File recording which chunks were upserted, so a failed run can resume."""
+    return KNOWLEDGE_BASE_PATH / f".seed_{tenant_slug}.checkpoint.json"
+
+
+def load_checkpoint(tenant_slug: str) -> Set[str]:
+    """Get the ids of chunks a previous run already upserted."""
+    path = checkpoint_path(tenant_slug)
+    if not path.exists():
+        return set()
+    return set(loads(path.read_bytes()))
+
+
+def save_checkpoint(tenant_slug: str, done_ids: Set[str]) -> None:
+    """Record upserted chunk ids (written atomically)."""
+    path = checkpoint_path(tenant_slug)
+    tmp_path = path.with_suffix(".tmp")
+    tmp_path.write_bytes(dumps(sorted(done_ids)))
+    tmp_path.replace(path)
+
+
+async def index_documents(
+    tenant_slug: str,
+    vector_docs: List[Dict[str, Any]],
+    done_ids: Set[str],
+) -> int:
+    """
+    Embed and upsert documents as a pipeline.
+
+    Documents are sorted by length and embedded in batches; a fixed pool of
+    upsert workers takes batches off a bounded queue, so Pinecone upserts
+    overlap with the remaining embedding requests. When the workers fall
+    behind the queue fills and embedding pauses, which bounds how many
+    embedded batches are held in memory. Ids of upserted chunks are
+    checkpointed after every batch.
+
+    Args:
+        tenant_slug: The tenant's slug
+        vector_docs: Documents in vector store format
+        done_ids: Ids already upserted; updated as batches complete
+
+    Returns:
+        Number of vectors upserted
+    """
+    embedding_service = get_embedding_service()
     vector_store = get_vector_store()
 
-    total_chunks = 0
+    # Similar-length inputs per request; each document carries its own id,
+    # so the order it is upserted in doesn't matter
+    docs = sorted(vector_docs, key=lambda doc: len(doc["content"]))
+    queue: asyncio.Queue = asyncio.Queue(maxsize=MAX_PENDING_BATCHES)
+
+    async def embed_batches() -> None:
+        for i in range(0, len(docs), EMBED_BATCH_SIZE):
+            batch = docs[i : i + EMBED_BATCH_SIZE]
+            embeddings = await embedding_service.embed_texts(
+                [doc["content"] for doc in batch]
+            )
+            # Blocks while the queue is full
+            await queue.put((batch, embeddings))
+        # One stop marker per worker
+        for _ in range(UPSERT_WORKERS):
+            await queue.put(None)
 
-    # Process each category folder
+    async def upsert_batches() -> int:
+        upserted = 0
+        while (item := await queue.get()) is not None:
+            batch, embeddings = item
+            upserted += await vector_store.upsert_embeddings(tenant_slug, batch, embeddings)
+            done_ids.update(doc["id"] for doc in batch)
+            save_checkpoint(tenant_slug, done_ids)
+        return upserted
+
+    # A failure in any task cancels the rest, so nothing waits on a dead queue
+    async with asyncio.TaskGroup() as group:
+        group.create_task(embed_batches())
+        workers = [group.create_task(upsert_batches()) for _ in range(UPSERT_WORKERS)]
+    return sum(worker.result() for worker in workers)
+
+
+def load_file(category: str, file_path: Path) -> List[Dict[str, Any]]:
+    """Read and chunk one knowledge base file (runs in a worker process)."""
+    processor = get_document_processor()
+
+    with open(file_path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return []
+        # Decode straight from the mapped pages, without reading into bytes first
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            content = str(mapped, "utf-8")
+
+    # Process into chunks
+    chunks = processor.process_text(
+        text=content,
+        document_id=f"seed_{category}_{file_path.stem}",
+        metadata={
+            "title": file_path.stem.replace("_", " ").title(),
+            "document_type": category.rstrip("s"),  # "competencies" -> "competency"
+            # Repo-relative, so content hashes match across checkouts
+            "source_file": file_path.relative_to(KNOWLEDGE_BASE_PATH.parent).as_posix(),
+        },
+    )
+
+    # Convert to vector store format
+    return processor.to_vector_documents(chunks)
+
+
+async def seed_knowledge_base(tenant_slug: str, resume: bool = False):
+    """Load initial knowledge base documents for a tenant."""
+    logger.info("Loading knowledge base for tenant: %s", tenant_slug)
+
+    done_ids = load_checkpoint(tenant_slug) if resume else set()
+    if done_ids:
+        logger.info("  Resuming: %d chunks already indexed", len(done_ids))
+
+    files = []
     for category in ["competencies", "rubrics", "examples"]:
         folder_path = KNOWLEDGE_BASE_PATH / category
         if not folder_path.exists():
-            print(f"  Skipping {category} (folder not found)")
+            logger.info("  Skipping %s (folder not found)", category)
             continue
+        files.extend((category, file_path) for file_path in folder_path.glob("*.md"))
 
-        print(f"\nProcessing {category}/")
+    # Chunking is CPU-bound, so spread files across processes
+    docs_per_file = []
+    if files:
+        loop = asyncio.get_running_loop()
+        max_workers = min(len(files), os.cpu_count() or 1)
+        # Spawn rather than fork: the logging listener thread is already running
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=max_workers, mp_context=context) as executor:
+            docs_per_file = await asyncio.gather(*(
+                loop.run_in_executor(executor, load_file, category, file_path)
+                for category, file_path in files
+            ))
 
-        for file_path in folder_path.glob("*.md"):
-            print(f"  - {file_path.name}")
+    # Chunks from every file are indexed together
+    vector_docs = []
+    for (category, file_path), docs in zip(files, docs_per_file):
+        logger.info("  - %s/%s: %d chunks", category, file_path.name, len(docs))
+        vector_docs.extend(docs)
 
-            content = file_path.read_text(encoding="utf-8")
-            document_id = f"seed_{category}_{file_path.stem}"
-
-            # Process into chunks
-            chunks = processor.process_text(
-                text=content,
-                document_id=document_id,
-                metadata={
-                    "title": file_path.stem.replace("_", " ").title(),
-                    "document_type": category.rstrip("s"),  # "competencies" -> "competency"
-                    "source_file": str(file_path),
-                },
-            )
+    # Skip chunks a previous run already upserted
+    vector_docs = [doc for doc in vector_docs if doc["id"] not in done_ids]
 
-            if chunks:
-                # Convert to vector store format
-                vector_docs = processor.to_vector_documents(chunks)
+    # Skip chunks already stored with the same content
+    unchanged = len(vector_docs)
+    vector_docs = await get_vector_store().filter_unchanged(tenant_slug, vector_docs)
+    unchanged -= len(vector_docs)
+    if unchanged:
+        logger.info("\nSkipping %d unchanged chunks", unchanged)
 
-                # Upsert to Pinecone
-                await vector_store.upsert_documents(tenant_slug, vector_docs)
-                total_chunks += len(chunks)
-                print(f"    ✓ {len(chunks)} chunks indexed")
+    total_chunks = 0
+    if vector_docs:
+        logger.info("\nIndexing %d chunks...", len(vector_docs))
+        total_chunks = await index_documents(tenant_slug, vector_docs, done_ids)
+    checkpoint_path(tenant_slug).unlink(missing_ok=True)
 
-    print(f"\n{'=' * 50}")
-    print(f"✓ Knowledge base loaded successfully!")
-    print(f"  Total chunks: {total_chunks}")
-    print(f"  Namespace: tenant_{tenant_slug}")
-    print(f"{'=' * 50}")
+    logger.info("\n%s", "=" * 50)
+    logger.info("✓ Knowledge base loaded successfully!")
+    logger.info("  Total chunks: %d", total_chunks)
+    logger.info("  Namespace: tenant_%s", tenant_slug)
+    logger.info("%s", "=" * 50)
 
 
 async def main():
@@ -82,20 +237,29 @@ async def main():
         action="store_true",
         help="Show what would be done without actually doing it",
     )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Skip chunks indexed by a previous run that failed",
+    )
 
     args = parser.parse_args()
 
     if args.dry_run:
-        print("DRY RUN - Would process:")
+        logger.info("DRY RUN - Would process:")
         for category in ["competencies", "rubrics", "examples"]:
             folder_path = KNOWLEDGE_BASE_PATH / category
             if folder_path.exists():
                 for file_path in folder_path.glob("*.md"):
-                    print(f"  {category}/{file_path.name}")
+                    logger.info("  %s/%s", category, file_path.name)
         return
 
-    await seed_knowledge_base(args.tenant_slug)
+    await seed_knowledge_base(args.tenant_slug, resume=args.resume)
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    log_listener = configure_logging()
+    try:
+        asyncio.run(main())
+    finally:
+        log_listener.stop()
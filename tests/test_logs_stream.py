@@ -0,0 +1,95 @@
+"""
+Tests for the streamed /logs response.
+"""
+import json
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("httpx")
+evaluate = pytest.importorskip("app.routers.evaluate")
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.deps import get_current_tenant
+
+
+def make_row():
+    """A row in LOG_LIST_COLUMNS order."""
+    return (
+        uuid4(),
+        "q_123",
+        None,
+        "message",
+        "response",
+        3,
+        False,
+        120,
+        "success",
+        None,
+        datetime(2024, 1, 1, tzinfo=timezone.utc),
+    )
+
+
+class FakeResult:
+    def __init__(self, partitions, error=None):
+        self._partitions = partitions
+        self._error = error
+
+    async def partitions(self):
+        for partition in self._partitions:
+            yield partition
+        if self._error is not None:
+            raise self._error
+
+
+class FakeSession:
+    """Stands in for AsyncSessionLocal, returning a canned stream."""
+
+    result: FakeResult
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    async def stream(self, stmt):
+        return self.result
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(evaluate, "AsyncSessionLocal", FakeSession)
+    app = FastAPI()
+    app.include_router(evaluate.router, prefix="/api/v1")
+    app.dependency_overrides[get_current_tenant] = lambda: SimpleNamespace(id=uuid4())
+    return TestClient(app)
+
+
+def test_logs_page_is_valid_json(client):
+    FakeSession.result = FakeResult([[make_row(), make_row()]])
+
+    response = client.get("/api/v1/logs", params={"limit": 2})
+
+    assert response.status_code == 200
+    body = json.loads(response.content)
+    assert len(body["logs"]) == 2
+    assert body["next_cursor"] is not None
+    assert "error" not in body
+
+
+def test_logs_db_error_mid_stream_closes_json_with_error(client):
+    FakeSession.result = FakeResult([[make_row()]], error=RuntimeError("connection lost"))
+
+    response = client.get("/api/v1/logs", params={"limit": 2})
+
+    assert response.status_code == 200
+    body = json.loads(response.content)
+    assert len(body["logs"]) == 1
+    assert body["error"]
+    assert body["next_cursor"] is None
@@ -0,0 +1,125 @@
+"""
+Tests for cached API key authentication and its cross-worker invalidation.
+"""
+import asyncio
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+
+pytest.importorskip("cachetools")
+pytest.importorskip("fastapi")
+lookup_cache = pytest.importorskip("app.services.lookup_cache")
+deps = pytest.importorskip("app.deps")
+
+from fastapi import HTTPException
+
+from app.core.security import generate_api_key, hash_api_key
+
+
+class UnusedDb:
+    """Database session that fails the test if the cache is bypassed."""
+
+    async def execute(self, stmt):
+        raise AssertionError("expected the cached tenant, not a database lookup")
+
+
+class FakePubSub:
+    def __init__(self, messages: asyncio.Queue):
+        self._messages = messages
+
+    async def psubscribe(self, pattern):
+        self.pattern = pattern
+
+    async def listen(self):
+        while True:
+            yield await self._messages.get()
+
+    async def reset(self):
+        pass
+
+
+class FakeRedis:
+    """Delivers published messages as raw bytes, like decode_responses=False."""
+
+    def __init__(self):
+        self.messages: asyncio.Queue = asyncio.Queue()
+
+    async def publish(self, channel: str, data: str):
+        await self.messages.put({
+            "type": "pmessage",
+            "pattern": lookup_cache.CHANNEL_PATTERN.encode(),
+            "channel": channel.encode(),
+            "data": data.encode(),
+        })
+
+    def pubsub(self):
+        return FakePubSub(self.messages)
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    service = lookup_cache.LookupCacheService()
+    monkeypatch.setattr(lookup_cache, "_lookup_cache", service)
+    return service
+
+
+def test_auth_hit_is_served_from_cache(cache):
+    api_key, _, _ = generate_api_key()
+    tenant = SimpleNamespace(id=uuid4(), is_active=True)
+    cache.set_tenant(hash_api_key(api_key), tenant, None)
+
+    result = asyncio.run(deps.get_current_tenant(x_api_key=api_key, db=UnusedDb()))
+
+    assert result is tenant
+
+
+def test_cached_key_expiry_is_enforced(cache):
+    api_key, _, _ = generate_api_key()
+    tenant = SimpleNamespace(id=uuid4(), is_active=True)
+    expired = datetime.utcnow() - timedelta(minutes=1)
+    cache.set_tenant(hash_api_key(api_key), tenant, expired)
+
+    with pytest.raises(HTTPException) as exc_info:
+        asyncio.run(deps.get_current_tenant(x_api_key=api_key, db=UnusedDb()))
+
+    assert exc_info.value.status_code == 401
+    assert exc_info.value.detail == "API key has expired"
+
+
+def test_published_invalidation_reaches_other_workers(monkeypatch):
+    redis = FakeRedis()
+
+    async def get_redis():
+        return redis
+
+    monkeypatch.setattr(lookup_cache, "get_redis", get_redis)
+
+    publisher = lookup_cache.LookupCacheService()
+    subscriber = lookup_cache.LookupCacheService()
+    tenant = SimpleNamespace(id=uuid4(), is_active=True)
+    other_tenant = SimpleNamespace(id=uuid4(), is_active=True)
+    for service in (publisher, subscriber):
+        service.set_tenant("key_hash", tenant, None)
+        service.set_tenant("other_key_hash", other_tenant, None)
+        service.set_assistants(tenant.id, [])
+
+    async def run():
+        listener = asyncio.create_task(subscriber.listen_for_invalidations())
+        await publisher.publish_invalidation(tenant.id, lookup_cache.SCOPE_AUTH)
+        # Let the listener take the message off the channel
+        while not redis.messages.empty():
+            await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        listener.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await listener
+
+    asyncio.run(run())
+
+    for service in (publisher, subscriber):
+        assert service.get_tenant("key_hash") is None
+        # Other tenants and other scopes are untouched
+        assert service.get_tenant("other_key_hash") == (other_tenant, None)
+        assert service.get_assistants(tenant.id) is not None
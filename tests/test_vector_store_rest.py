@@ -0,0 +1,84 @@
+"""
+Tests for the REST (non-gRPC) Pinecone client setup.
+"""
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("pinecone")
+pytest.importorskip("numpy")
+vector_store = pytest.importorskip("app.services.vector_store")
+
+INDEX_HOST = "reskilling-rag-abc123.svc.aped-1234.pinecone.io"
+
+
+@pytest.fixture
+def rest_service(monkeypatch):
+    """A VectorStoreService on the REST client, with control-plane calls faked."""
+    settings = vector_store.settings
+    monkeypatch.setattr(settings, "pinecone_use_grpc", False)
+    monkeypatch.setattr(settings, "pinecone_api_key", "test-key")
+    monkeypatch.setattr(settings, "pinecone_pool_threads", 7)
+
+    service = vector_store.VectorStoreService()
+    monkeypatch.setattr(
+        service.pc,
+        "list_indexes",
+        lambda: SimpleNamespace(names=lambda: [service.index_name]),
+    )
+    monkeypatch.setattr(
+        service.pc,
+        "describe_index",
+        lambda name: SimpleNamespace(host=INDEX_HOST),
+    )
+    return service
+
+
+def test_rest_service_builds_index(rest_service):
+    assert not rest_service._use_grpc
+    assert rest_service.index is not None
+
+
+def test_data_plane_config_is_authenticated_and_pooled(rest_service):
+    config = rest_service._data_plane_config(f"https://{INDEX_HOST}")
+
+    assert config.api_key
+    assert config.host == f"https://{INDEX_HOST}"
+    assert config.connection_pool_maxsize == 7
+
+
+class FakeIndex:
+    """Records upserted batches instead of sending them."""
+
+    def __init__(self):
+        self.batches = []
+
+    def upsert(self, vectors, namespace):
+        self.batches.append(vectors)
+        return SimpleNamespace(upserted_count=len(vectors))
+
+
+def test_quantized_vectors_are_sent_as_floats(rest_service):
+    import asyncio
+
+    from pinecone.data.vector_factory import VectorFactory
+
+    rest_service._quantize_vectors = True
+    rest_service._index = FakeIndex()
+    documents = [
+        {"id": "doc_chunk_0", "content": "first", "metadata": {}},
+        {"id": "doc_chunk_1", "content": "second", "metadata": {}},
+    ]
+    embeddings = [[0.5, -0.25, 0.125], [0.1, 0.2, -0.3]]
+
+    upserted = asyncio.run(
+        rest_service.upsert_embeddings("acme", documents, embeddings)
+    )
+
+    assert upserted == 2
+    vectors = [vector for batch in rest_service._index.batches for vector in batch]
+    for vector_id, values, metadata in vectors:
+        assert all(type(value) is float and value.is_integer() for value in values)
+        assert max(abs(value) for value in values) == 127.0
+        # Builds the REST model with type checking, as Index.upsert does
+        VectorFactory.build((vector_id, values, metadata))
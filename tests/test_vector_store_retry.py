@@ -0,0 +1,65 @@
+"""
+Tests for classifying Pinecone upsert errors as retryable.
+"""
+import pytest
+
+pytest.importorskip("pinecone")
+pytest.importorskip("tenacity")
+pytest.importorskip("numpy")
+
+from pinecone.exceptions import PineconeException
+
+from app.services.vector_store import _is_retryable
+
+
+class FakeStatusCode:
+    """Stand-in for a grpc.StatusCode member."""
+
+    def __init__(self, name: str):
+        self.name = name
+
+
+class FakeRpcError(Exception):
+    """Stand-in for grpc's _InactiveRpcError."""
+
+    def __init__(self, code_name: str):
+        super().__init__(code_name)
+        self._code = FakeStatusCode(code_name)
+
+    def code(self) -> FakeStatusCode:
+        return self._code
+
+
+def wrap_grpc_error(code_name: str) -> PineconeException:
+    """Raise a gRPC error the way the Pinecone gRPC client does and return it."""
+    try:
+        try:
+            raise FakeRpcError(code_name)
+        except FakeRpcError as e:
+            raise PineconeException("upsert failed") from e
+    except PineconeException as wrapped:
+        return wrapped
+
+
+@pytest.mark.parametrize("code_name", ["RESOURCE_EXHAUSTED", "UNAVAILABLE", "DEADLINE_EXCEEDED"])
+def test_wrapped_grpc_error_is_retried(code_name):
+    assert _is_retryable(wrap_grpc_error(code_name))
+
+
+def test_wrapped_grpc_client_error_is_not_retried():
+    assert not _is_retryable(wrap_grpc_error("INVALID_ARGUMENT"))
+
+
+def test_rest_status_is_used():
+    class FakeApiException(Exception):
+        def __init__(self, status: int):
+            super().__init__(status)
+            self.status = status
+
+    assert _is_retryable(FakeApiException(429))
+    assert _is_retryable(FakeApiException(503))
+    assert not _is_retryable(FakeApiException(400))
+
+
+def test_unrelated_error_is_not_retried():
+    assert not _is_retryable(ValueError("bad vector"))